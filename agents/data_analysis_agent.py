@@ -7,8 +7,15 @@ from datetime import datetime
 class DataAnalysisAgent:
     def __init__(self):
         self.name = "DataAnalysisAgent"
-        self.isolation_forest = IsolationForest(contamination=0.1, random_state=42)
+        self._isolation_forest = None
         print(f"✓ {self.name} initialized")
+    
+    @property
+    def isolation_forest(self):
+        """Created on first use; it is fitted per vehicle in detect_anomalies, so there is nothing to persist"""
+        if self._isolation_forest is None:
+            self._isolation_forest = IsolationForest(contamination=0.1, random_state=42)
+        return self._isolation_forest
         
     def load_vehicle_data(self, vehicle_id):
         try:
@@ -1,36 +1,144 @@
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 
+from feature_pipeline import VehicleFeatureBuilder
+from model_store import config_hash, default_store
+from prediction_cache import PredictionCache
+from tree_compiler import compile_model
+
+MODEL_CONFIG = {
+    "estimator": "RandomForestClassifier",
+    "params": {"n_estimators": 50, "random_state": 42},
+    "training": {"seed": 42, "samples": 200, "features": 4}
+}
+
+# Cache bucket width per feature: engine temp (°C), oil pressure (bar), sensor health (%), mileage (km)
+CACHE_BUCKETS = (0.5, 0.05, 1.0, 100.0)
+
+# Share of the overall failure probability attributed to each component, and the cut-off for reporting it
+COMPONENTS = ("bearing", "oil_pump", "fuel_injector")
+COMPONENT_WEIGHTS = np.array([0.85, 0.45, 0.30])
+COMPONENT_THRESHOLD = 0.5
+
 class DiagnosisAgent:
-    def __init__(self):
+    def __init__(self, store=None, config=MODEL_CONFIG, cache=None, features=None):
         self.name = "DiagnosisAgent"
-        self.model = RandomForestClassifier(n_estimators=50, random_state=42)
-        X_train = np.random.randn(200, 4)
-        y_train = np.random.randint(0, 2, 200)
-        self.model.fit(X_train, y_train)
+        self.store = store or default_store()
+        self.config = config
+        self.cache = cache if cache is not None else PredictionCache(CACHE_BUCKETS)
+        self.features = features or VehicleFeatureBuilder()
+        self._artifact = None
+    
+    def _train_model(self):
+        training = self.config["training"]
+        rng = np.random.RandomState(training["seed"])
+        X_train = rng.randn(training["samples"], training["features"])
+        y_train = rng.randint(0, 2, training["samples"])
+        model = RandomForestClassifier(**self.config["params"])
+        model.fit(X_train, y_train)
+        return model
+    
+    def _load(self):
+        """Load (or train once and persist) the model on first use, then switch to any published update of it"""
+        if self._artifact is None:
+            self.set_model(self.store.load_or_train(self.name, self.config, self._train_model), config_hash(self.config))
+            self.refresh()
+        return self._artifact
+    
+    def publish(self, model, version):
+        """Persist a model as the served version and hot-swap it; other processes pick it up with refresh()"""
+        self.store.publish(self.name, version, model)
+        self.set_model(model, version)
+    
+    def refresh(self):
+        """Switch to the store's published version of this model if it changed; True if the model was swapped"""
+        version = self.store.current(self.name)
+        if version is None or version == self.model_version or not version.startswith(config_hash(self.config)):
+            return False
+        model = self.store.load_version(self.name, version)
+        if model is None:
+            return False
+        self.set_model(model, version)
+        return True
+    
+    def set_model(self, model, version):
+        """Hot-swap the scoring model (any fitted classifier with predict_proba)"""
+        self._artifact = {"model": model, "compiled": compile_model(model), "version": version}
+    
+    @property
+    def model(self):
+        return self._load()["model"]
+    
+    @property
+    def compiled(self):
+        """Flattened copy of the forest for single-row scoring (None if it is not a tree ensemble)"""
+        return self._load()["compiled"]
+    
+    @property
+    def model_version(self):
+        return self._load()["version"]
+    
+    def _score_one(self, artifact, features):
+        if artifact["compiled"] is not None:
+            return float(artifact["compiled"].predict_proba_one(features))
+        return float(artifact["model"].predict_proba(features.reshape(1, -1))[0][1])
     
     def predict_failures(self, vehicle_id):
-        features = np.array([[88, 3.2, 65, 75000]])
-        failure_prob = self.model.predict_proba(features)[0][1]
-        
-        predictions = {
-            "vehicle_id": vehicle_id,
-            "failure_probability": round(failure_prob * 100, 1),
-            "risk_level": "CRITICAL" if failure_prob > 0.8 else "HIGH" if failure_prob > 0.6 else "MEDIUM" if failure_prob > 0.4 else "LOW",
-            "predicted_failures": [],
-        }
-        
-        components = {
-            "bearing": failure_prob * 0.85,
-            "oil_pump": failure_prob * 0.45,
-            "fuel_injector": failure_prob * 0.30,
-        }
-        
-        for component, prob in components.items():
-            if prob > 0.5:
-                predictions["predicted_failures"].append({
-                    "component": component,
-                    "failure_probability": round(prob * 100, 1),
-                })
+        artifact = self._load()
+        features = self.features.row(vehicle_id)
+        failure_prob = self.cache.get_or_compute(
+            artifact["version"], features, lambda: self._score_one(artifact, features)
+        )
+        return self._reports([vehicle_id], np.array([failure_prob]))[0]
+    
+    def predict_failures_batch(self, vehicle_ids, features=None, use_cache=False):
+        """Diagnose many vehicles with one model call
         
-        return predictions
+        `features` optionally supplies the (N, 4) matrix; by default it is
+        built from each vehicle's telemetry. With use_cache, rows found in the
+        prediction cache are not rescored. Returns predict_failures results
+        in input order.
+        """
+        vehicle_ids = list(vehicle_ids)
+        if not vehicle_ids:
+            return []
+        X = self.features.matrix(vehicle_ids) if features is None else np.asarray(features, dtype=np.float64)
+        expected = (len(vehicle_ids), self.model.n_features_in_)
+        if X.shape != expected:
+            raise ValueError(f"expected features shaped {expected}, got {X.shape}")
+        if use_cache:
+            failure_prob = self.cache.get_or_compute_many(self.model_version, X, self.failure_probability)
+        else:
+            failure_prob = self.failure_probability(X)
+        return self._reports(vehicle_ids, failure_prob)
+    
+    def failure_probability(self, matrix):
+        """Failure probability for each row of an (N, 4) feature matrix, in one model call"""
+        artifact = self._load()
+        X = np.asarray(matrix, dtype=np.float64)
+        if artifact["compiled"] is not None:
+            return artifact["compiled"].predict_proba(X)[:, 1]
+        return artifact["model"].predict_proba(X)[:, 1]
+    
+    def _reports(self, vehicle_ids, failure_prob):
+        """predict_failures results from an array of failure probabilities"""
+        component_prob = np.outer(failure_prob, COMPONENT_WEIGHTS)
+        flagged = component_prob > COMPONENT_THRESHOLD
+        risk_level = np.select(
+            [failure_prob > 0.8, failure_prob > 0.6, failure_prob > 0.4], ["CRITICAL", "HIGH", "MEDIUM"], "LOW"
+        )
+        failure_pct = np.round(failure_prob * 100, 1).tolist()
+        component_pct = np.round(component_prob * 100, 1).tolist()
+    
+        reports = []
+        for i, vehicle_id in enumerate(vehicle_ids):
+            reports.append({
+                "vehicle_id": vehicle_id,
+                "failure_probability": failure_pct[i],
+                "risk_level": str(risk_level[i]),
+                "predicted_failures": [
+                    {"component": component, "failure_probability": component_pct[i][j]}
+                    for j, component in enumerate(COMPONENTS) if flagged[i, j]
+                ],
+            })
+        return reports
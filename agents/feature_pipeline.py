@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import numpy as np
+
+# DiagnosisAgent model inputs, in column order
+FEATURES = ("engine_temp_celsius", "oil_pressure_bar", "sensor_health", "mileage")
+TELEMETRY_FEATURES = FEATURES[:3]
+# Used for any feature a vehicle has no data for (the row predict_failures used to score for every vehicle)
+FEATURE_DEFAULTS = np.array([88.0, 3.2, 65.0, 75000.0])
+
+
+def _epoch(timestamp):
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')).timestamp()
+
+
+class VehicleFeatureBuilder:
+    """Builds DiagnosisAgent feature rows from each vehicle's telemetry.
+
+    Sources are plain callables, so the agent does not depend on where
+    telemetry is kept:
+      latest(vehicle_id)          -> newest reading dict, or None
+      history(vehicle_id, limit)  -> {column: array} of the newest `limit` readings, oldest first
+      vehicle_info(vehicle_id)    -> registry dict with "mileage", or None
+
+    Each telemetry feature is the mean over the last `window` history
+    readings plus the latest reading when it is newer than the history,
+    which smooths single-sample sensor noise. Features without any data fall
+    back to FEATURE_DEFAULTS.
+    """
+
+    def __init__(self, latest=None, history=None, vehicle_info=None, window=12):
+        self.latest = latest
+        self.history = history
+        self.vehicle_info = vehicle_info
+        self.window = window
+
+    def _telemetry(self, vehicle_id):
+        """(sums, counts) of each telemetry feature over the vehicle's window"""
+        sums = np.zeros(len(TELEMETRY_FEATURES))
+        counts = np.zeros(len(TELEMETRY_FEATURES))
+        newest = None
+        if self.history is not None:
+            data = self.history(vehicle_id, self.window)
+            for j, name in enumerate(TELEMETRY_FEATURES):
+                values = np.asarray(data.get(name, ()), dtype=np.float64)[-self.window:]
+                values = values[~np.isnan(values)]
+                sums[j] += values.sum()
+                counts[j] += len(values)
+            timestamps = data.get("timestamp")
+            if timestamps is not None and len(timestamps):
+                newest = float(timestamps[-1])
+
+        reading = self.latest(vehicle_id) if self.latest is not None else None
+        if reading and (newest is None or (_epoch(reading.get("timestamp")) or 0) > newest):
+            for j, name in enumerate(TELEMETRY_FEATURES):
+                value = reading.get(name)
+                if isinstance(value, (int, float)) and value == value:
+                    sums[j] += value
+                    counts[j] += 1
+        return sums, counts
+
+    def matrix(self, vehicle_ids):
+        """(len(vehicle_ids), len(FEATURES)) feature matrix in input order"""
+        X = np.tile(FEATURE_DEFAULTS, (len(vehicle_ids), 1))
+        n = len(TELEMETRY_FEATURES)
+        for i, vehicle_id in enumerate(vehicle_ids):
+            sums, counts = self._telemetry(vehicle_id)
+            have = counts > 0
+            X[i, :n][have] = sums[have] / counts[have]
+            info = self.vehicle_info(vehicle_id) if self.vehicle_info is not None else None
+            if info and info.get("mileage") is not None:
+                X[i, FEATURES.index("mileage")] = float(info["mileage"])
+        return X
+
+    def row(self, vehicle_id):
+        return self.matrix([vehicle_id])[0]
@@ -0,0 +1,351 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout
+
+import numpy as np
+
+from diagnosis_agent import DiagnosisAgent
+from ml_predictor import AdvancedMLPredictor
+from model_store import ModelStore
+
+
+class InferenceError(Exception):
+    """A request the models could not score (bad input or a worker-side failure)"""
+
+
+class WorkerLostError(InferenceError):
+    """The worker scoring a request died before answering"""
+
+
+def _score(predictor, diagnosis, kind, payloads):
+    """Results for one micro-batch, in payload order"""
+    if kind == "predict":
+        scores = predictor.predict_batch(np.array(payloads, dtype=np.float64), use_cache=True)
+        return [
+            {"failure_risk": float(risk), "confidence_score": float(confidence), "days_until_failure": int(days)}
+            for risk, confidence, days in zip(
+                scores["failure_risk"], scores["confidence_score"], scores["days_until_failure"]
+            )
+        ]
+    if kind == "diagnose":
+        # Payloads are (vehicle_id, feature row or None); rows the caller did not build come from the agent's own sources
+        vehicle_ids = [vehicle_id for vehicle_id, _ in payloads]
+        features = diagnosis.features.matrix(vehicle_ids)
+        for i, (_, row) in enumerate(payloads):
+            if row is not None:
+                features[i] = row
+        return diagnosis.predict_failures_batch(vehicle_ids, features, use_cache=True)
+    raise ValueError(f"unknown inference request {kind!r}")
+
+
+def _cache_stats(predictor, diagnosis):
+    return {"predictor": predictor.cache.stats(), "diagnosis": diagnosis.cache.stats()}
+
+
+def merge_cache_stats(per_process):
+    """Fleet-wide hit rates from each process's _cache_stats, keyed by pid"""
+    merged = {}
+    for stats in per_process.values():
+        for name, cache in stats.items():
+            total = merged.setdefault(name, {"entries": 0, "hits": 0, "misses": 0})
+            for key in total:
+                total[key] += cache[key]
+    for total in merged.values():
+        lookups = total["hits"] + total["misses"]
+        total["hit_rate"] = round(total["hits"] / lookups, 4) if lookups else 0.0
+    return dict(merged, processes=per_process)
+
+
+def _resolve(future, result=None, error=None):
+    """Complete a future unless its caller already gave up on it"""
+    try:
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+    except InvalidStateError:
+        pass  # cancelled by InferenceService.abandon
+
+
+def _refresh(predictor, diagnosis):
+    """Switch to model versions an OnlineLearner published from another process"""
+    for agent in (predictor, diagnosis):
+        try:
+            agent.refresh()
+        except Exception as e:
+            print(f"  ❌ Could not refresh {agent.name}: {e}")
+
+
+def _worker_main(tasks, results, model_dir, refresh_interval):
+    """Inference worker: load the stored models once, then score micro-batches until sent None"""
+    store = ModelStore(model_dir)
+    predictor, diagnosis = AdvancedMLPredictor(store), DiagnosisAgent(store)
+    predictor._load()
+    diagnosis._load()
+    refreshed = time.monotonic()
+    results.put(("ready", os.getpid()))
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        batch_id, kind, payloads = task
+        results.put(("taken", batch_id, os.getpid()))
+        if time.monotonic() - refreshed >= refresh_interval:
+            _refresh(predictor, diagnosis)
+            refreshed = time.monotonic()
+        try:
+            outputs = [(result, None) for result in _score(predictor, diagnosis, kind, payloads)]
+        except Exception:
+            # Rescore one by one so a malformed request only fails itself
+            outputs = []
+            for payload in payloads:
+                try:
+                    outputs.append((_score(predictor, diagnosis, kind, [payload])[0], None))
+                except Exception as e:
+                    outputs.append((None, f"{type(e).__name__}: {e}"))
+        results.put((batch_id, outputs, os.getpid(), _cache_stats(predictor, diagnosis)))
+
+
+class InferenceService:
+    """Pool of worker processes that score model requests off the caller's GIL.
+
+    Every worker loads the persisted AdvancedMLPredictor and DiagnosisAgent
+    models once at start, and checks the model store for newly published
+    (online-learned) versions at most every `refresh_interval` seconds. `submit` returns a Future; a batching thread
+    groups requests of the same kind that arrive within `batch_window`
+    seconds (up to `max_batch`) into one task, so a burst of single-row
+    predictions costs one predict_proba call. Workers pull tasks from a
+    shared queue, which spreads load across cores.
+
+    Workers are forked, like ShardedSimulator's shards: start the service
+    before the host process launches its own threads.
+
+    A request the models reject (e.g. a row of the wrong width) fails with
+    InferenceError, as in-process scoring does. A monitor thread checks the
+    workers every `check_interval` seconds. When one has died, the batches it
+    had taken fail with WorkerLostError and a replacement is forked. A worker
+    that dies between dequeuing a batch and reporting it leaves that batch to
+    the client timeout.
+    """
+
+    def __init__(self, workers=None, batch_window=0.002, max_batch=256, model_dir=None, refresh_interval=1.0,
+                 check_interval=0.5):
+        self.workers = workers or mp.cpu_count()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.model_dir = model_dir
+        self.refresh_interval = refresh_interval
+        self.check_interval = check_interval
+        self.requests = 0
+        self.batches = 0
+        self.restarts = 0
+        self._requests = queue.Queue()
+        self._inflight = {}
+        self._owners = {}
+        self._cache_stats = {}
+        self._batch_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._processes = []
+        self._threads = []
+        self._stopping = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, timeout=120):
+        """Launch the workers and wait until each has its models loaded"""
+        self._tasks = mp.Queue()
+        self._results = mp.Queue()
+        self._stopping.clear()
+        self._processes = [self._spawn() for _ in range(self.workers)]
+        for _ in range(self.workers):
+            self._results.get(timeout=timeout)
+        for target in (self._batch_loop, self._collect_loop, self._monitor_loop):
+            thread = threading.Thread(target=target, daemon=True, name=f"inference-{target.__name__}")
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _spawn(self):
+        process = mp.Process(
+            target=_worker_main, args=(self._tasks, self._results, self.model_dir, self.refresh_interval), daemon=True
+        )
+        process.start()
+        return process
+
+    def submit(self, kind, payload):
+        """Queue one request ("predict" with a feature row, or "diagnose" with (vehicle_id, feature row or None))"""
+        future = Future()
+        self._requests.put((kind, payload, future))
+        return future
+
+    def _batch_loop(self):
+        stopping = False
+        while not stopping:
+            item = self._requests.get()
+            if item is None:
+                break
+            pending = {}
+            count = 0
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                kind, payload, future = item
+                pending.setdefault(kind, ([], []))
+                pending[kind][0].append(payload)
+                pending[kind][1].append(future)
+                count += 1
+                remaining = deadline - time.monotonic()
+                if count >= self.max_batch or remaining <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+            for kind, (payloads, futures) in pending.items():
+                batch_id = next(self._batch_ids)
+                with self._lock:
+                    self._inflight[batch_id] = futures
+                    self.requests += len(futures)
+                    self.batches += 1
+                self._tasks.put((batch_id, kind, payloads))
+
+    def _collect_loop(self):
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+            if message[0] == "ready":
+                continue  # a replacement worker came up
+            if message[0] == "taken":
+                _, batch_id, pid = message
+                with self._lock:
+                    if batch_id in self._inflight:
+                        self._owners[batch_id] = pid
+                continue
+            batch_id, outputs, pid, cache_stats = message
+            with self._lock:
+                futures = self._inflight.pop(batch_id, [])
+                self._owners.pop(batch_id, None)
+                self._cache_stats[pid] = cache_stats
+            for future, (result, error) in zip(futures, outputs):
+                _resolve(future, result, InferenceError(error) if error else None)
+
+    def _monitor_loop(self):
+        while not self._stopping.wait(self.check_interval):
+            for i, process in enumerate(self._processes):
+                if process.is_alive() or self._stopping.is_set():
+                    continue
+                with self._lock:
+                    lost = [batch_id for batch_id, pid in self._owners.items() if pid == process.pid]
+                    futures = [future for batch_id in lost for future in self._inflight.pop(batch_id, [])]
+                    for batch_id in lost:
+                        del self._owners[batch_id]
+                    self._cache_stats.pop(process.pid, None)
+                    self.restarts += 1
+                error = f"inference worker {process.pid} exited with code {process.exitcode}"
+                print(f"  ❌ {error}, restarting it")
+                for future in futures:
+                    _resolve(future, error=WorkerLostError(error))
+                self._processes[i] = self._spawn()
+
+    def abandon(self, futures):
+        """Cancel requests a caller stopped waiting for, and forget batches nobody waits on any more"""
+        for future in futures:
+            future.cancel()
+        with self._lock:
+            for batch_id in [b for b, waiting in self._inflight.items() if all(f.done() for f in waiting)]:
+                del self._inflight[batch_id]
+                self._owners.pop(batch_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "alive": sum(process.is_alive() for process in self._processes),
+                "restarts": self.restarts,
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "inflight_batches": len(self._inflight),
+                "queued": self._requests.qsize(),
+                "cache": merge_cache_stats(dict(self._cache_stats))
+            }
+
+    def stop(self):
+        """Stop the batching thread and the worker processes"""
+        batcher, collector, monitor = self._threads
+        self._stopping.set()
+        monitor.join(timeout=5)
+        self._requests.put(None)
+        batcher.join(timeout=5)
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+        self._results.put(None)
+        collector.join(timeout=5)
+        self._processes = []
+        self._threads = []
+
+
+class InferenceClient:
+    """Blocking facade used by the API: scores through an InferenceService, or in-process when service is None"""
+
+    def __init__(self, service=None, timeout=10.0, refresh_interval=1.0):
+        self.service = service
+        self.timeout = timeout
+        self.refresh_interval = refresh_interval
+        self._local = None
+        self._refreshed = 0.0
+
+    def _run(self, kind, payloads):
+        if self.service is None:
+            if self._local is None:
+                self._local = (AdvancedMLPredictor(), DiagnosisAgent())
+            if time.monotonic() - self._refreshed >= self.refresh_interval:
+                _refresh(*self._local)
+                self._refreshed = time.monotonic()
+            try:
+                return _score(*self._local, kind, payloads)
+            except Exception as e:
+                raise InferenceError(f"{type(e).__name__}: {e}")
+        futures = [self.service.submit(kind, payload) for payload in payloads]
+        try:
+            return [future.result(self.timeout) for future in futures]
+        except FutureTimeout:
+            self.service.abandon(futures)
+            raise TimeoutError(f"inference did not finish within {self.timeout}s")
+
+    def cache_stats(self):
+        """Prediction cache hit rates of the processes doing the scoring"""
+        if self.service is not None:
+            return self.service.stats()["cache"]
+        return merge_cache_stats({os.getpid(): _cache_stats(*self._local)} if self._local else {})
+
+    def predict(self, features):
+        """AdvancedMLPredictor scores for one feature row"""
+        return self.predict_many([features])[0]
+
+    def predict_many(self, rows):
+        return self._run("predict", [[float(v) for v in row] for row in rows])
+
+    def diagnose(self, vehicle_id, features=None):
+        """DiagnosisAgent.predict_failures for one vehicle, optionally from a prebuilt feature row"""
+        return self.diagnose_many([vehicle_id], None if features is None else [features])[0]
+
+    def diagnose_many(self, vehicle_ids, features=None):
+        """Diagnose many vehicles; `features` is an optional matrix with one row per vehicle"""
+        rows = [None] * len(vehicle_ids) if features is None else [[float(v) for v in row] for row in features]
+        if len(rows) != len(vehicle_ids):
+            raise ValueError(f"expected {len(vehicle_ids)} feature rows, got {len(rows)}")
+        return self._run("diagnose", list(zip(vehicle_ids, rows)))
@@ -1,31 +1,111 @@
 import numpy as np
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
-import pickle
+
+from model_store import config_hash, default_store
+from prediction_cache import PredictionCache
+from tree_compiler import compile_model
+
+MODEL_CONFIG = {
+    "estimator": "GradientBoostingClassifier",
+    "params": {"n_estimators": 100, "max_depth": 5, "learning_rate": 0.1},
+    "training": {"seed": 42, "samples": 500, "features": 8, "positive_rate": 0.3}
+}
+
+# Cache bucket width per feature, in input units (0.5 °C engine temperature, 0.05 bar oil pressure, ...)
+CACHE_BUCKETS = (0.5, 0.05, 1.0, 0.1, 100.0, 0.5, 1.0, 1.0)
 
 class AdvancedMLPredictor:
-    def __init__(self):
+    def __init__(self, store=None, config=MODEL_CONFIG, cache=None):
         self.name = "AdvancedMLPredictor"
-        self.model = GradientBoostingClassifier(n_estimators=100, max_depth=5, learning_rate=0.1)
-        self.scaler = StandardScaler()
-        self._train_model()
+        self.store = store or default_store()
+        self.config = config
+        self.cache = cache if cache is not None else PredictionCache(CACHE_BUCKETS)
+        self._artifact = None
     
     def _train_model(self):
         """Train on realistic vehicle failure patterns"""
-        np.random.seed(42)
-        X_train = np.random.randn(500, 8)
-        y_train = np.random.binomial(1, 0.3, 500)
+        training = self.config["training"]
+        rng = np.random.RandomState(training["seed"])
+        X_train = rng.randn(training["samples"], training["features"])
+        y_train = rng.binomial(1, training["positive_rate"], training["samples"])
+        
+        scaler = StandardScaler()
+        model = GradientBoostingClassifier(**self.config["params"])
+        model.fit(scaler.fit_transform(X_train), y_train)
+        return {"model": model, "scaler": scaler}
+    
+    def _load(self):
+        """Load (or train once and persist) the model on first use, then switch to any published update of it"""
+        if self._artifact is None:
+            artifact = self.store.load_or_train(self.name, self.config, self._train_model)
+            self.set_model(artifact["model"], config_hash(self.config), artifact["scaler"])
+            self.refresh()
+        return self._artifact
+    
+    def publish(self, model, version, scaler=None):
+        """Persist a model as the served version and hot-swap it; other processes pick it up with refresh()"""
+        self.store.publish(self.name, version, {"model": model, "scaler": scaler})
+        self.set_model(model, version, scaler)
+    
+    def refresh(self):
+        """Switch to the store's published version of this model if it changed; True if the model was swapped"""
+        version = self.store.current(self.name)
+        if version is None or version == self.model_version or not version.startswith(config_hash(self.config)):
+            return False
+        artifact = self.store.load_version(self.name, version)
+        if artifact is None:
+            return False
+        self.set_model(artifact["model"], version, artifact["scaler"])
+        return True
+    
+    def set_model(self, model, version, scaler=None):
+        """Hot-swap the scoring model
         
-        X_scaled = self.scaler.fit_transform(X_train)
-        self.model.fit(X_scaled, y_train)
+        The replacement (and its compiled form) is built before a single
+        reference assignment, so in-flight predictions finish on the model
+        they started with. With scaler=None features go to the model as-is.
+        """
+        self._artifact = {
+            "model": model,
+            "scaler": scaler,
+            "compiled": compile_model(model),
+            "version": version
+        }
+    
+    @property
+    def model(self):
+        return self._load()["model"]
+    
+    @property
+    def scaler(self):
+        return self._load()["scaler"]
+    
+    @property
+    def compiled(self):
+        """Flattened copy of the model for single-row scoring (None if it is not a tree ensemble)"""
+        return self._load()["compiled"]
+    
+    @property
+    def model_version(self):
+        return self._load()["version"]
+    
+    def _score_one(self, artifact, features):
+        """Failure probability of one raw feature vector"""
+        scaler = artifact["scaler"]
+        X_scaled = features if scaler is None else (features - scaler.mean_) / scaler.scale_
+        if artifact["compiled"] is not None:
+            return float(artifact["compiled"].predict_proba_one(X_scaled))
+        return float(artifact["model"].predict_proba(X_scaled.reshape(1, -1))[0][1])
     
     def predict_with_confidence(self, telemetry_data):
         """Return prediction + confidence interval"""
-        features = np.array(telemetry_data).reshape(1, -1)
-        X_scaled = self.scaler.transform(features)
-        
-        prediction = self.model.predict_proba(X_scaled)[0][1]
-        confidence = self.model.predict_proba(X_scaled)[0].max()
+        artifact = self._load()
+        features = np.asarray(telemetry_data, dtype=np.float64).ravel()
+        prediction = self.cache.get_or_compute(
+            artifact["version"], features, lambda: self._score_one(artifact, features)
+        )
+        confidence = max(prediction, 1 - prediction)
         
         return {
             "failure_risk": round(prediction * 100, 1),
@@ -33,6 +113,49 @@ class AdvancedMLPredictor:
             "days_until_failure": max(1, int(30 * (1 - prediction)))
         }
 
+    def failure_probability(self, matrix):
+        """Failure probability for each row of a raw (N, 8) feature matrix"""
+        artifact = self._load()
+        X = np.asarray(matrix, dtype=np.float64)
+        if artifact["scaler"] is not None:
+            X = artifact["scaler"].transform(X)
+        return artifact["model"].predict_proba(X)[:, 1]
+
+    def predict_batch(self, matrix, chunk_size=50000, use_cache=False):
+        """Score an (N, 8) array or DataFrame in one predict_proba call per chunk
+
+        Returns columnar results: failure_risk, confidence_score (percent) and
+        days_until_failure, each an array of length N in input order. With
+        use_cache, rows are looked up in the prediction cache first and only
+        the misses are scored (worth it for request-sized batches, not bulk
+        scoring).
+        """
+        artifact = self._load()
+        model, scaler = artifact["model"], artifact["scaler"]
+        features = matrix.to_numpy(dtype=np.float64) if hasattr(matrix, "to_numpy") else np.asarray(matrix, dtype=np.float64)
+        n_features = model.n_features_in_
+        if features.ndim != 2 or features.shape[1] != n_features:
+            raise ValueError(f"expected an (N, {n_features}) matrix, got shape {features.shape}")
+
+        def score(rows):
+            X = rows if scaler is None else scaler.transform(rows)
+            return model.predict_proba(X)[:, 1]
+
+        if use_cache:
+            failure_prob = self.cache.get_or_compute_many(artifact["version"], features, score)
+        else:
+            failure_prob = np.empty(len(features))
+            for start in range(0, len(features), chunk_size):
+                block = slice(start, start + chunk_size)
+                failure_prob[block] = score(features[block])
+        confidence = np.maximum(failure_prob, 1 - failure_prob)
+
+        return {
+            "failure_risk": np.round(failure_prob * 100, 1),
+            "confidence_score": np.round(confidence * 100, 1),
+            "days_until_failure": np.maximum(1, (30 * (1 - failure_prob)).astype(np.int64))
+        }
+
 if __name__ == "__main__":
     predictor = AdvancedMLPredictor()
     result = predictor.predict_with_confidence([85, 3.2, 65, 11.5, 75000, 18, 85, 90])
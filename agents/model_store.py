@@ -0,0 +1,134 @@
+import fcntl
+import hashlib
+import json
+import os
+import pickle
+import threading
+from datetime import datetime
+
+import sklearn
+
+MODEL_DIR = os.getenv(
+    'GUARDIAN_MODEL_DIR',
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'models')
+)
+
+
+def config_hash(config):
+    """Short content hash of a training config (plus the sklearn version the artifact is pickled with)"""
+    payload = json.dumps({"config": config, "sklearn": sklearn.__version__}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class ModelStore:
+    """Versioned on-disk store for trained model artifacts.
+
+    An artifact is saved as `<name>/<hash>.pkl` with a `<hash>.json` metadata
+    sidecar, where the hash covers the training config. Changing the config
+    (or upgrading sklearn) therefore trains a new version instead of loading
+    a stale one, and every process after the first just loads the pickle.
+    Training holds an exclusive lock on `<name>/.train.lock`, so processes
+    starting together on an empty store train once and the rest wait and load.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or MODEL_DIR
+        self._lock = threading.Lock()
+
+    def _paths(self, name, version):
+        base = os.path.join(self.directory, name, version)
+        return base + ".pkl", base + ".json"
+
+    def load(self, name, config):
+        """Stored artifact for this config, or None"""
+        return self.load_version(name, config_hash(config))
+
+    def load_version(self, name, version):
+        """Stored artifact of an explicit version, or None"""
+        path, _ = self._paths(name, version)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"  ❌ Could not load model artifact {path}: {e}")
+            return None
+
+    def save(self, name, config, artifact):
+        """Write an artifact atomically; returns its version hash"""
+        version = config_hash(config)
+        self._save_version(name, version, artifact, {"config": config})
+        return version
+
+    def _save_version(self, name, version, artifact, meta):
+        path, meta_path = self._paths(name, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        tmp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(dict({
+                "name": name,
+                "version": version,
+                "sklearn": sklearn.__version__,
+                "created": datetime.now().isoformat()
+            }, **meta), f, indent=2, default=str)
+        os.replace(tmp, meta_path)
+
+    def publish(self, name, version, artifact, **meta):
+        """Store an artifact under an explicit version (e.g. an online update) and make it the served one"""
+        self._save_version(name, version, artifact, meta)
+        pointer = os.path.join(self.directory, name, "CURRENT")
+        tmp = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, pointer)
+
+    def current(self, name):
+        """Most recently published version of a model, or None"""
+        try:
+            with open(os.path.join(self.directory, name, "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load_or_train(self, name, config, train):
+        """Load the artifact for `config`, training and saving it with `train()` on a miss"""
+        artifact = self.load(name, config)
+        if artifact is not None:
+            return artifact
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        with self._lock, open(os.path.join(self.directory, name, ".train.lock"), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            artifact = self.load(name, config)
+            if artifact is None:
+                artifact = train()
+                self.save(name, config, artifact)
+                print(f"✓ Trained and stored {name} model ({config_hash(config)})")
+        return artifact
+
+    def versions(self, name):
+        """Metadata of every stored version of a model, newest first"""
+        directory = os.path.join(self.directory, name)
+        if not os.path.isdir(directory):
+            return []
+        versions = []
+        for filename in os.listdir(directory):
+            if filename.endswith(".json"):
+                with open(os.path.join(directory, filename)) as f:
+                    versions.append(json.load(f))
+        return sorted(versions, key=lambda v: v["created"], reverse=True)
+
+
+_default_store = None
+
+
+def default_store():
+    """Process-wide ModelStore rooted at MODEL_DIR"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ModelStore()
+    return _default_store
@@ -0,0 +1,190 @@
+import copy
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import log_loss
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+ONLINE_PARAMS = {"loss": "log_loss", "alpha": 1e-4, "random_state": 42}
+CLASSES = np.array([0, 1])
+
+
+def window_features(window):
+    """Feature row for a telemetry window: column means of a (readings, features) block, or a ready-made row"""
+    window = np.asarray(window, dtype=np.float64)
+    return window.mean(axis=0) if window.ndim == 2 else window.ravel()
+
+
+class OnlineLearner:
+    """Keeps a predictor's model current from labelled telemetry windows.
+
+    `observe` queues windows with their failure/no-failure outcome and
+    `update` consumes them in mini-batches: a StandardScaler and an SGD
+    logistic model are advanced with partial_fit, and a copy of both is then
+    published through the target (AdvancedMLPredictor or DiagnosisAgent):
+    stored in its ModelStore as the served version and hot-swapped in place.
+    Other processes scoring with the same store (inference workers) switch to
+    it on their next `refresh()`, and a restarted learner resumes from it.
+    Training never mutates the objects inference is reading, so scoring is
+    not blocked and never sees a half-updated model.
+
+    The SGD model replaces the target's tree ensemble (which cannot be
+    updated incrementally), so swaps are gated: nothing is published before
+    `min_samples` windows have been learned, and each candidate must score a
+    log loss no worse than the serving model on held-out windows (every
+    `holdout_every`-th observed window is kept for validation, never trained on).
+    """
+
+    def __init__(self, target, batch_size=256, max_pending=100000, params=ONLINE_PARAMS, featurize=window_features,
+                 min_samples=1000, holdout_every=5, min_holdout=100, max_holdout=2000):
+        self.target = target
+        self.batch_size = batch_size
+        self.featurize = featurize
+        self.min_samples = min_samples
+        self.holdout_every = holdout_every
+        self.min_holdout = min_holdout
+        self.scaler = StandardScaler()
+        self.model = SGDClassifier(**params)
+        self.base_version = None
+        self.resumed_from = None
+        self.updates = 0
+        self.published = 0
+        self.rejected = 0
+        self.samples_seen = 0
+        self.observed = 0
+        self.last_validation = None
+        self.last_update = None
+        self.last_update_lag = None
+        self._pending = deque(maxlen=max_pending)
+        self._holdout = deque(maxlen=max_holdout)
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._thread = None
+
+    def observe(self, window, failed, timestamp=None):
+        """Queue one labelled window; returns the number of windows waiting to be learned"""
+        row = self.featurize(window)
+        n_features = self.target.model.n_features_in_
+        if len(row) != n_features:
+            raise ValueError(f"{type(self.target).__name__} expects {n_features} features, got {len(row)}")
+        with self._lock:
+            self.observed += 1
+            if self.holdout_every and self.observed % self.holdout_every == 0:
+                self._holdout.append((row, int(bool(failed))))
+            else:
+                self._pending.append((row, int(bool(failed)), timestamp or time.time()))
+            return len(self._pending)
+
+    def observe_batch(self, windows, labels, timestamp=None):
+        pending = 0
+        for window, failed in zip(windows, labels):
+            pending = self.observe(window, failed, timestamp)
+        return pending
+
+    def update(self):
+        """Learn from up to one mini-batch of pending windows and publish the result; False if nothing was pending"""
+        with self._train_lock:
+            with self._lock:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            if not batch:
+                return False
+
+            X = np.array([row for row, _, _ in batch])
+            y = np.array([label for _, label, _ in batch])
+            if self.base_version is None:
+                n_features = self.target.model.n_features_in_
+                if X.shape[1] != n_features:
+                    raise ValueError(f"{type(self.target).__name__} expects {n_features} features, got {X.shape[1]}")
+                self.base_version, _, published = self.target.model_version.partition("+online.")
+                pipeline = self.target.model
+                if published and hasattr(pipeline, "steps"):
+                    # Continue from the published online model (e.g. after a restart) instead of starting over
+                    self.scaler, self.model = copy.deepcopy(pipeline[0]), copy.deepcopy(pipeline[-1])
+                    self.published = int(published)
+                    self.resumed_from = self.target.model_version
+
+            self.scaler.partial_fit(X)
+            self.model.partial_fit(self.scaler.transform(X), y, classes=CLASSES)
+            self.updates += 1
+            self.samples_seen += len(batch)
+
+            model = make_pipeline(copy.deepcopy(self.scaler), copy.deepcopy(self.model))
+            if self._accept(model):
+                self.published += 1
+                self.target.publish(model, f"{self.base_version}+online.{self.published}")
+                now = time.time()
+                self.last_update = now
+                self.last_update_lag = now - min(received for _, _, received in batch)
+            return True
+
+    def _accept(self, candidate):
+        """Whether a candidate may replace the serving model (see the class docstring)"""
+        if self.samples_seen < self.min_samples and self.resumed_from is None:
+            return False
+        with self._lock:
+            holdout = list(self._holdout)
+        if len(holdout) < self.min_holdout:
+            return False
+        X = np.array([row for row, _ in holdout])
+        y = np.array([label for _, label in holdout])
+        candidate_loss = log_loss(y, candidate.predict_proba(X)[:, 1], labels=CLASSES)
+        serving_loss = log_loss(y, np.clip(self.target.failure_probability(X), 1e-15, 1 - 1e-15), labels=CLASSES)
+        self.last_validation = {
+            "candidate_log_loss": round(float(candidate_loss), 4),
+            "serving_log_loss": round(float(serving_loss), 4),
+            "holdout": len(holdout)
+        }
+        if candidate_loss > serving_loss:
+            self.rejected += 1
+            return False
+        return True
+
+    def run_pending(self):
+        """Train on everything queued so far; returns the number of mini-batches applied"""
+        applied = 0
+        while self.update():
+            applied += 1
+        return applied
+
+    def start(self, interval=5.0):
+        """Apply pending windows every `interval` seconds on a daemon thread"""
+        if self._thread is None:
+            def run():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.run_pending()
+                    except Exception as e:
+                        print(f"  ❌ Online update failed: {e}")
+
+            self._thread = threading.Thread(target=run, daemon=True, name=f"online-{self.target.name}")
+            self._thread.start()
+        return self
+
+    def status(self):
+        """Serving model version and how far training trails the labelled stream"""
+        with self._lock:
+            pending = len(self._pending)
+            oldest = self._pending[0][2] if pending else None
+            holdout = len(self._holdout)
+        return {
+            "model": self.target.name,
+            "model_version": self.target.model_version,
+            "updates": self.updates,
+            "published": self.published,
+            "rejected": self.rejected,
+            "samples_seen": self.samples_seen,
+            "min_samples": self.min_samples,
+            "resumed_from": self.resumed_from,
+            "holdout": holdout,
+            "last_validation": self.last_validation,
+            "pending": pending,
+            "training_lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "last_update": datetime.fromtimestamp(self.last_update).isoformat() if self.last_update else None,
+            "last_update_lag_seconds": round(self.last_update_lag, 3) if self.last_update_lag is not None else None
+        }
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_SIZE = int(os.getenv('GUARDIAN_PREDICTION_CACHE_SIZE', 10000))
+CACHE_TTL = float(os.getenv('GUARDIAN_PREDICTION_CACHE_TTL', 300))
+
+
+class PredictionCache:
+    """LRU + TTL cache of model scores keyed by a quantized feature vector.
+
+    Each feature is snapped to a bucket of its own width (e.g. 0.5 °C,
+    0.05 bar), so readings that differ by less than a bucket share an entry.
+    At most `max_entries` scores are kept and each lives for `ttl` seconds.
+    Entries belong to one model version: a lookup with a different version
+    (after retraining or an online update) drops the whole cache.
+    max_entries=0 disables caching.
+    """
+
+    def __init__(self, buckets, max_entries=CACHE_SIZE, ttl=CACHE_TTL):
+        self.buckets = np.asarray(buckets, dtype=np.float64)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, features):
+        """Bucket index of every feature, as hashable bytes"""
+        return np.floor(np.asarray(features, dtype=np.float64) / self.buckets + 0.5).astype(np.int64).tobytes()
+
+    def _use_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, version, features):
+        """Cached score for this bucket, or None"""
+        if not self.max_entries:
+            return None
+        key = self.key(features)
+        with self._lock:
+            self._use_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, version, features, value):
+        if not self.max_entries:
+            return
+        key = self.key(features)
+        with self._lock:
+            self._use_version(version)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def get_or_compute(self, version, features, compute):
+        """Cached score, or `compute()` stored under this bucket"""
+        value = self.get(version, features)
+        if value is None:
+            value = compute()
+            self.put(version, features, value)
+        return value
+
+    def get_or_compute_many(self, version, matrix, compute):
+        """Scores for each row of `matrix`: cached rows are reused, the rest come from one `compute(rows)` call"""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        values = np.empty(len(matrix))
+        missing = []
+        for i, row in enumerate(matrix):
+            value = self.get(version, row)
+            if value is None:
+                missing.append(i)
+            else:
+                values[i] = value
+        if missing:
+            for i, value in zip(missing, compute(matrix[missing])):
+                values[i] = value
+                self.put(version, matrix[i], float(value))
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit-rate metrics for tuning bucket sizes"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "buckets": self.buckets.tolist(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,145 @@
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+
+class CompiledTreeEnsemble:
+    """A fitted GradientBoosting/RandomForest classifier flattened into NumPy arrays.
+
+    All trees share one node table (feature, threshold, children, value).
+    `children[2 * node + went_left]` is the next node, and leaves point to
+    themselves, so every row can be stepped `max_depth` times without
+    branching on leaf-ness. Inputs are compared as float32,
+    like sklearn's own trees, so leaf assignment is identical and
+    probabilities match `predict_proba` up to floating-point summation order.
+    Only binary classifiers are supported.
+    """
+
+    def __init__(self, kind, feature, threshold, children, value, roots, max_depth,
+                 n_features, init=0.0, learning_rate=1.0):
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.init = init
+        self.learning_rate = learning_rate
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if isinstance(model, GradientBoostingClassifier):
+            if model.n_trees_per_iteration_ != 1:
+                raise ValueError("only binary GradientBoostingClassifier models can be compiled")
+            trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+            kind = "gradient_boosting"
+        elif isinstance(model, RandomForestClassifier):
+            if model.n_classes_ != 2:
+                raise ValueError("only binary RandomForestClassifier models can be compiled")
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            kind = "random_forest"
+        else:
+            raise TypeError(f"cannot compile {type(model).__name__}")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            if kind == "gradient_boosting":
+                values.append(tree.value[:, 0, 0])
+            else:
+                counts = tree.value[:, 0, :]
+                values.append(counts[:, 1] / counts.sum(axis=1))
+            roots.append(offset)
+            offset += tree.node_count
+
+        children = np.empty(2 * offset, dtype=np.intp)
+        children[0::2] = np.concatenate(rights)
+        children[1::2] = np.concatenate(lefts)
+        compiled = cls(
+            kind,
+            np.concatenate(features).astype(np.intp),
+            np.concatenate(thresholds).astype(np.float64),
+            children,
+            np.concatenate(values).astype(np.float64),
+            np.array(roots, dtype=np.intp),
+            max(tree.max_depth for tree in trees),
+            model.n_features_in_
+        )
+        if kind == "gradient_boosting":
+            compiled.learning_rate = model.learning_rate
+            # The prior (init estimator) is whatever decision_function adds on top of the trees
+            probe = np.zeros((1, model.n_features_in_))
+            compiled.init = float(model.decision_function(probe)[0] - compiled._tree_sum(probe)[0])
+        return compiled
+
+    def _check_width(self, width):
+        # Rows are walked through a flattened view, so a wrong width would silently read the next row's values
+        if width != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got {width}")
+
+    def _leaves(self, X):
+        """Leaf node of every (row, tree) pair"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"expected an (n, {self.n_features}) matrix, got shape {X.shape}")
+        self._check_width(X.shape[1])
+        offsets = (np.arange(len(X)) * self.n_features)[:, None]
+        flat = X.ravel()
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            went_left = flat.take(offsets + self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = self.children.take(2 * nodes + went_left)
+        return nodes
+
+    def _tree_sum(self, X):
+        return self.value.take(self._leaves(X)).sum(axis=1) * self.learning_rate
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities for an (n, n_features) matrix"""
+        X = np.atleast_2d(X)
+        if self.kind == "gradient_boosting":
+            positive = 1.0 / (1.0 + np.exp(-(self.init + self._tree_sum(X))))
+        else:
+            positive = self.value.take(self._leaves(X)).mean(axis=1)
+        return np.column_stack((1.0 - positive, positive))
+
+    def predict_proba_one(self, x):
+        """Positive-class probability for a single feature vector (low-latency path)"""
+        x = np.asarray(x, dtype=np.float32).ravel()
+        self._check_width(len(x))
+        feature, threshold, children = self.feature, self.threshold, self.children
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = children.take(2 * nodes + (x.take(feature.take(nodes)) <= threshold.take(nodes)))
+        if self.kind == "gradient_boosting":
+            return 1.0 / (1.0 + np.exp(-(self.init + self.value.take(nodes).sum() * self.learning_rate)))
+        return self.value.take(nodes).mean()
+
+    def save(self, path):
+        np.savez(
+            path, kind=self.kind, feature=self.feature, threshold=self.threshold,
+            children=self.children, value=self.value, roots=self.roots, max_depth=self.max_depth,
+            n_features=self.n_features, init=self.init, learning_rate=self.learning_rate
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                str(data["kind"]), data["feature"], data["threshold"], data["children"], data["value"],
+                data["roots"], int(data["max_depth"]), int(data["n_features"]), float(data["init"]), float(data["learning_rate"])
+            )
+
+
+def compile_model(model):
+    """Flatten a fitted tree ensemble for fast inference, or None for any other estimator"""
+    if not isinstance(model, (GradientBoostingClassifier, RandomForestClassifier)):
+        return None
+    return CompiledTreeEnsemble.from_sklearn(model)
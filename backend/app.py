@@ -1,15 +1,116 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+import json
+from datetime import datetime
 from agents.guardian_crew import run_guardian_crew
 from dotenv import load_dotenv
 import os
+import sys
+import threading
 
 # Load environment variables
 load_dotenv()
 
+from config import Config
+from database import create_database_from_config, rolling_savings
+from frame_codec import CONTENT_TYPE as CODEC_CONTENT_TYPE, encode_records
+from retention import RetentionManager
+from telemetry_events import TelemetryBroadcaster
+from telemetry_ingest import TelemetryIngestBuffer, follow_log, log_sink, validate_reading
+from telemetry_log import TelemetryLog
+from telemetry_ring import TelemetryRing
+from timeseries_store import SERIES_COLUMNS, TimeSeriesStore
+
+# The ML agents live in the repo-level agents/ directory as plain modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'agents'))
+from feature_pipeline import TELEMETRY_FEATURES, VehicleFeatureBuilder
+from diagnosis_agent import DiagnosisAgent
+from inference_service import InferenceClient, InferenceError, InferenceService, WorkerLostError
+from ml_predictor import AdvancedMLPredictor
+from online_learner import OnlineLearner
+
 app = Flask(__name__)
 CORS(app)
 
+events = TelemetryBroadcaster(Config.SSE_HISTORY)
+
+# Storage, inference workers and background threads; created by start_services()
+inference_service = None
+inference = None
+db = None
+retention = None
+telemetry_log = None
+timeseries = None
+ingest = None
+diagnosis_features = None
+learners = {}
+
+# Vehicles enter the registry (and total_vehicles) the first time they report telemetry
+known_vehicles = set()
+known_vehicles_lock = threading.Lock()
+
+def register_vehicles(records):
+    """Telemetry sink: add vehicles seen for the first time to the database"""
+    with known_vehicles_lock:
+        new = sorted({r["vehicle_id"] for r in records} - known_vehicles)
+        known_vehicles.update(new)
+    if new:
+        now = datetime.now().isoformat()
+        db.add_vehicles([{"vehicle_id": vehicle_id, "created_at": now, "source": "telemetry"} for vehicle_id in new])
+
+def start_services():
+    """Open storage and start the inference workers and background threads, once per process
+
+    Nothing is started at import, so a reloader or WSGI server that imports
+    this module does not run a second copy. Returns the app.
+    """
+    global inference_service, inference, db, retention, telemetry_log, timeseries, ingest, diagnosis_features, learners
+    if db is not None:
+        return app
+
+    # Workers are forked, so start them before the background threads below
+    inference_service = InferenceService(
+        Config.INFERENCE_WORKERS,
+        batch_window=Config.INFERENCE_BATCH_WINDOW_MS / 1000,
+        max_batch=Config.INFERENCE_MAX_BATCH,
+        refresh_interval=Config.INFERENCE_REFRESH_SECONDS
+    ).start() if Config.INFERENCE_WORKERS > 0 else None
+    inference = InferenceClient(
+        inference_service, Config.INFERENCE_TIMEOUT_SECONDS, refresh_interval=Config.INFERENCE_REFRESH_SECONDS
+    )
+
+    db = create_database_from_config(Config)
+    retention = RetentionManager(db, Config.ARCHIVE_DIR, Config.RETENTION_TTL_DAYS)
+    retention.start_background(Config.RETENTION_INTERVAL_SECONDS)
+    known_vehicles.update(v.get('vehicle_id') for v in db.get_all_vehicles())
+
+    telemetry_log = TelemetryLog(Config.TELEMETRY_INGEST_DIR)
+    timeseries = TimeSeriesStore(
+        Config.TIMESERIES_DIR, Config.TIMESERIES_CHUNK_SIZE, max_open=Config.TIMESERIES_MAX_OPEN_SERIES
+    )
+    ingest = TelemetryIngestBuffer(
+        sinks=[log_sink(telemetry_log), timeseries.sink, register_vehicles],
+        capacity=Config.INGEST_QUEUE_CAPACITY,
+        flush_batch=Config.INGEST_FLUSH_BATCH,
+        flush_interval=Config.INGEST_FLUSH_INTERVAL_MS / 1000,
+        watermark=timeseries.last_timestamp
+    ).start()
+    # Frames from RealtimeSimulator reach the history store, the stream endpoint and SSE clients
+    follow_log(Config.TELEMETRY_LOG_DIR, [timeseries.sink, ingest.observe, events.publish, register_vehicles])
+    # DiagnosisAgent features are built here, where the telemetry is, and scored by the inference workers
+    diagnosis_features = VehicleFeatureBuilder(
+        latest=ingest.latest.get,
+        history=lambda vehicle_id, limit: timeseries.query(vehicle_id, columns=("timestamp",) + TELEMETRY_FEATURES, limit=limit)
+    )
+    # Labelled windows from /api/ml/feedback train online models, published through the model store to the workers
+    learners = {
+        "predictor": OnlineLearner(AdvancedMLPredictor(), min_samples=Config.ONLINE_MIN_SAMPLES),
+        "diagnosis": OnlineLearner(DiagnosisAgent(features=diagnosis_features), min_samples=Config.ONLINE_MIN_SAMPLES)
+    } if Config.ONLINE_LEARNING else {}
+    for learner in learners.values():
+        learner.start(Config.ONLINE_UPDATE_INTERVAL_SECONDS)
+    return app
+
 # ============= HEALTH CHECK =============
 @app.route('/api/health', methods=['GET'])
 def health():
@@ -18,7 +119,8 @@ def health():
         "status": "OK",
         "timestamp": "2025-10-31T12:05:38.765719",
         "version": "2.0.0-agentic",
-        "architecture": "Multi-Agent CrewAI System"
+        "architecture": "Multi-Agent CrewAI System",
+        "database_cache": db.cache_stats()
     }), 200
 
 # ============= AUTONOMOUS CREW ENDPOINT =============
@@ -38,6 +140,13 @@ def diagnose_vehicle():
         
         # RUN THE AUTONOMOUS CREW
         result = run_guardian_crew(vehicle_id, sensor_data)
+        db.add_workflow({
+            "workflow_id": f"WF_{vehicle_id}_{result['timestamp']}",
+            "vehicle_id": vehicle_id,
+            "timestamp": result['timestamp'],
+            "status": "failed" if 'error' in result else "completed",
+            "decision": result.get('crew_output', result.get('error'))
+        })
         
         return jsonify({
             "status": "success",
@@ -175,153 +284,433 @@ def get_vehicle_detail(vehicle_id):
         "data": vehicle
     }), 200
 
-# ============= WORKFLOWS ENDPOINT =============
-@app.route('/api/workflows', methods=['GET'])
-def get_workflows():
-    """Get workflow execution history"""
+# ============= PAGINATION =============
+MAX_PAGE_SIZE = 500
+
+def paginated(collection):
+    """Serve one keyset page of a collection using the request's query args"""
+    try:
+        limit = min(int(request.args.get('limit', 50)), MAX_PAGE_SIZE)
+        page = db.query(
+            collection,
+            limit=max(limit, 1),
+            cursor=request.args.get('cursor'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            vehicle_id=request.args.get('vehicle_id'),
+            severity=request.args.get('severity')
+        )
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
     return jsonify({
         "status": "success",
-        "data": [
-            {
-                "workflow_id": "WF_001",
-                "vehicle_id": "VH1001",
-                "timestamp": "2025-10-31T14:30:00Z",
-                "agents_involved": ["Diagnostic Specialist", "Customer Engagement", "ROI Analyst", "Master Orchestrator"],
-                "status": "completed",
-                "decision": "Schedule urgent maintenance - Bearing failure predicted",
-                "estimated_savings": 35000,
-                "execution_time_seconds": 12.5,
-                "confidence": 89
-            },
-            {
-                "workflow_id": "WF_002",
-                "vehicle_id": "VH1003",
-                "timestamp": "2025-10-31T12:15:00Z",
-                "agents_involved": ["Diagnostic Specialist", "ROI Analyst", "Master Orchestrator"],
-                "status": "completed",
-                "decision": "Monitor for 48 hours - Oil system showing early degradation",
-                "estimated_savings": 15000,
-                "execution_time_seconds": 8.3,
-                "confidence": 76
-            },
-            {
-                "workflow_id": "WF_003",
-                "vehicle_id": "VH1005",
-                "timestamp": "2025-10-31T10:45:00Z",
-                "agents_involved": ["Diagnostic Specialist", "Customer Engagement", "ROI Analyst"],
-                "status": "completed",
-                "decision": "Schedule maintenance within 2 weeks - Cooling system needs attention",
-                "estimated_savings": 22000,
-                "execution_time_seconds": 10.1,
-                "confidence": 68
-            },
-            {
-                "workflow_id": "WF_004",
-                "vehicle_id": "VH1002",
-                "timestamp": "2025-10-31T09:30:00Z",
-                "agents_involved": ["Diagnostic Specialist"],
-                "status": "completed",
-                "decision": "All systems healthy - Continue regular monitoring",
-                "estimated_savings": 0,
-                "execution_time_seconds": 4.2,
-                "confidence": 95
-            }
-        ]
+        "data": page['items'],
+        "next_cursor": page['next_cursor']
     }), 200
 
+# ============= WORKFLOWS ENDPOINT =============
+@app.route('/api/workflows', methods=['GET'])
+def get_workflows():
+    """Get workflow execution history (newest first, cursor paginated)"""
+    return paginated('workflows')
+
 # ============= ALERTS ENDPOINT =============
 @app.route('/api/alerts', methods=['GET'])
 def get_alerts():
-    """Get predictive alerts"""
-    return jsonify({
-        "status": "success",
-        "data": [
-            {
-                "alert_id": "ALR_001",
-                "vehicle_id": "VH1001",
-                "severity": "critical",
-                "predicted_failure": "Bearing failure",
-                "confidence": 89,
-                "days_to_failure": "3-5",
-                "recommended_action": "Immediate service required - Schedule within 24 hours",
-                "estimated_cost_if_ignored": 50000,
-                "preventive_cost": 15000,
-                "potential_savings": 35000,
-                "timestamp": "2025-10-31T14:30:00Z",
-                "acknowledged": False
-            },
-            {
-                "alert_id": "ALR_002",
-                "vehicle_id": "VH1003",
-                "severity": "warning",
-                "predicted_failure": "Oil system degradation",
-                "confidence": 76,
-                "days_to_failure": "7-10",
-                "recommended_action": "Schedule maintenance within a week",
-                "estimated_cost_if_ignored": 35000,
-                "preventive_cost": 12000,
-                "potential_savings": 23000,
-                "timestamp": "2025-10-31T12:15:00Z",
-                "acknowledged": False
-            },
-            {
-                "alert_id": "ALR_003",
-                "vehicle_id": "VH1005",
-                "severity": "warning",
-                "predicted_failure": "Cooling system issue",
-                "confidence": 68,
-                "days_to_failure": "10-14",
-                "recommended_action": "Schedule maintenance within 2 weeks",
-                "estimated_cost_if_ignored": 40000,
-                "preventive_cost": 18000,
-                "potential_savings": 22000,
-                "timestamp": "2025-10-31T10:45:00Z",
-                "acknowledged": True
-            }
-        ]
-    }), 200
+    """Get predictive alerts (newest first, cursor paginated)"""
+    return paginated('alerts')
 
 # ============= ANALYTICS ENDPOINT =============
 @app.route('/api/analytics', methods=['GET'])
 def analytics():
-    """Get fleet analytics and KPIs"""
+    """Get fleet analytics and KPIs from the materialized aggregates"""
+    stats = db.get_analytics()
+    counters = stats['analytics']
+    aggregates = stats['aggregates']
+    risk_levels = aggregates.get('vehicles_by_risk_level', {})
+    return jsonify({
+        "status": "success",
+        "data": {
+            "total_vehicles": aggregates.get('total_vehicles', 0),
+            "healthy_vehicles": risk_levels.get('LOW', 0),
+            "warning_vehicles": risk_levels.get('MEDIUM', 0) + risk_levels.get('HIGH', 0),
+            "critical_vehicles": risk_levels.get('CRITICAL', 0),
+            "total_predictions": counters.get('total_predictions', 0),
+            "total_alerts": counters.get('total_alerts', 0),
+            "total_appointments": counters.get('total_appointments', 0),
+            "total_estimated_savings": counters.get('cost_savings', 0),
+            "rolling_savings_30d": rolling_savings(aggregates),
+            "uptime_improvement": counters.get('uptime_improvement', 0),
+            "alerts_by_severity": aggregates.get('alerts_by_severity', {}),
+            "alerts_by_vehicle": aggregates.get('alerts_by_vehicle', {}),
+            "predictions_by_vehicle": aggregates.get('predictions_by_vehicle', {}),
+            "latest_risk": aggregates.get('latest_risk', {})
+        }
+    }), 200
+
+# ============= TELEMETRY INGESTION =============
+def parse_readings():
+    """Readings from a JSON array, {"readings": [...]} or an NDJSON body"""
+    if 'ndjson' in (request.content_type or ''):
+        body = request.get_data()
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    payload = json.loads(request.get_data() or b'null')
+    if isinstance(payload, dict):
+        payload = payload.get('readings')
+    if not isinstance(payload, list):
+        raise ValueError("expected an array of readings")
+    return payload
+
+@app.route('/api/telemetry/batch', methods=['POST'])
+def ingest_telemetry():
+    """Validate a batch of readings and stage it for batched storage writes"""
+    try:
+        readings = parse_readings()
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid body: {e}"
+        }), 400
+    if len(readings) > Config.INGEST_MAX_BATCH:
+        return jsonify({
+            "status": "error",
+            "message": f"Batch too large (max {Config.INGEST_MAX_BATCH} readings)"
+        }), 413
+
+    checked, rejected = [], []
+    for index, reading in enumerate(readings):
+        error = validate_reading(reading)
+        if error:
+            rejected.append({"index": index, "error": error})
+        else:
+            checked.append((index, reading))
+    # History is append-only, so readings older than the vehicle's newest one would be dropped later
+    late = set(ingest.late([reading for _, reading in checked]))
+    valid = []
+    for position, (index, reading) in enumerate(checked):
+        if position in late:
+            rejected.append({"index": index, "error": "older than the vehicle's latest reading"})
+        else:
+            valid.append(reading)
+    rejected.sort(key=lambda r: r["index"])
+
+    if valid and not ingest.offer(valid):
+        response = jsonify({
+            "status": "error",
+            "message": "Ingest queue full, retry later"
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 429
+    if valid:
+        events.publish(valid)
+
+    return jsonify({
+        "status": "success" if not rejected else "partial",
+        "accepted": len(valid),
+        "rejected": rejected[:100],
+        "rejected_count": len(rejected)
+    }), 202 if valid else 400
+
+@app.route('/api/telemetry/stream', methods=['GET'])
+def telemetry_stream():
+    """Latest reading per vehicle, served from memory
+
+    ?format=compact (or Accept: application/x-guardian-frames) returns the
+    snapshot as a delta-encoded, compressed frame stream (see frame_codec.py).
+    """
+    if request.args.get('format') == 'compact' or CODEC_CONTENT_TYPE in request.headers.get('Accept', ''):
+        snapshot = ingest.snapshot()
+        timestamp = datetime.fromisoformat(snapshot['timestamp']) if snapshot['timestamp'] else None
+        return Response(encode_records(snapshot['vehicles'], timestamp), mimetype=CODEC_CONTENT_TYPE)
+    return jsonify({
+        "status": "success",
+        "data": ingest.snapshot(),
+        "ingest": ingest.stats(),
+        "timeseries": timeseries.stats()
+    }), 200
+
+@app.route('/api/telemetry/events', methods=['GET'])
+def telemetry_events():
+    """Server-Sent Events: a snapshot, then only changed readings as they arrive
+
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) to resume.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    return Response(
+        events.stream(last_event_id, Config.SSE_HEARTBEAT_SECONDS),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+ring = None
+
+def telemetry_ring():
+    """The simulator's shared-memory ring, mapped on first use (None until the writer has created it)"""
+    global ring
+    if ring is None and Config.TELEMETRY_RING_PATH and os.path.exists(Config.TELEMETRY_RING_PATH):
+        ring = TelemetryRing.open(Config.TELEMETRY_RING_PATH)
+    return ring
+
+@app.route('/api/telemetry/ring', methods=['GET'])
+def telemetry_ring_ticks():
+    """Latest ?ticks=N fleet ticks straight from the simulator's ring (TELEMETRY_RING_PATH)"""
+    try:
+        ticks = int(request.args.get('ticks', 1))
+        if ticks < 1:
+            raise ValueError("ticks must be at least 1")
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        source = telemetry_ring()
+        if source is None:
+            return jsonify({
+                "status": "error",
+                "message": "No telemetry ring (set TELEMETRY_RING_PATH and start the simulator)"
+            }), 404
+        data = source.latest(min(ticks, source.capacity), copy=True)
+    except (OSError, ValueError, RuntimeError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
     return jsonify({
         "status": "success",
         "data": {
-            "total_vehicles": 5,
-            "healthy_vehicles": 2,
-            "warning_vehicles": 2,
-            "critical_vehicles": 1,
-            "total_predictions": 47,
-            "total_alerts": 12,
-            "autonomous_decisions": 8,
-            "crew_interventions": 4,
-            "total_estimated_savings": 95000,
-            "avg_prediction_confidence": 81,
-            "uptime_percentage": 94.5,
-            "maintenance_scheduled": 3,
-            "maintenance_completed": 15
+            "seq": data.pop("seq"),
+            "vehicle_ids": source.vehicle_ids,
+            **{name: values.tolist() for name, values in data.items()}
         }
     }), 200
 
 # ============= HEALTH HISTORY ENDPOINT =============
+MAX_HISTORY_POINTS = 5000
+
 @app.route('/api/vehicles/<vehicle_id>/history', methods=['GET'])
 def get_vehicle_history(vehicle_id):
-    """Get historical sensor data for a vehicle"""
+    """Get historical sensor data for a vehicle (newest first)
+
+    Query args: since/until (ISO time), points (point budget; the finest of
+    raw/1m/1h/1d that fits is used) and columns (comma-separated subset).
+    Rollup points carry the bucket mean plus <column>_min/_max/_count.
+    """
+    try:
+        points = min(int(request.args.get('points', request.args.get('limit', Config.HISTORY_MAX_POINTS))), MAX_HISTORY_POINTS)
+        columns = request.args.get('columns')
+        columns = [c for c in columns.split(',') if c != 'timestamp'] if columns else list(SERIES_COLUMNS[1:])
+        unknown = [c for c in columns if c not in SERIES_COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown columns: {', '.join(unknown)}")
+        resolution, data = timeseries.history(
+            vehicle_id,
+            start=request.args.get('since'),
+            end=request.args.get('until'),
+            max_points=max(points, 1)
+        )
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+    if resolution is None:
+        fields = {name: name for name in columns}
+    else:
+        fields = {}
+        for name in columns:
+            fields[name] = f"{name}_mean"
+            for stat in ('min', 'max', 'count'):
+                fields[f"{name}_{stat}"] = f"{name}_{stat}"
+
+    timestamps = [datetime.fromtimestamp(ts).isoformat() for ts in data['timestamp'].tolist()]
+    values = {key: [None if v != v else v for v in data[source].tolist()] for key, source in fields.items()}
+    for key in values:
+        if key.endswith('_count'):
+            values[key] = [int(v) for v in values[key]]
+    history = []
+    for i in reversed(range(len(timestamps))):
+        point = {"timestamp": timestamps[i]}
+        for key in values:
+            point[key] = values[key][i]
+        history.append(point)
     return jsonify({
         "status": "success",
         "data": {
             "vehicle_id": vehicle_id,
-            "history": [
-                {"timestamp": "2025-10-31T14:00:00Z", "engine_temp": 103, "oil_pressure": 2.3, "sensor_health": 62},
-                {"timestamp": "2025-10-31T12:00:00Z", "engine_temp": 98, "oil_pressure": 2.5, "sensor_health": 65},
-                {"timestamp": "2025-10-31T10:00:00Z", "engine_temp": 92, "oil_pressure": 2.8, "sensor_health": 68},
-                {"timestamp": "2025-10-31T08:00:00Z", "engine_temp": 88, "oil_pressure": 3.0, "sensor_health": 70},
-                {"timestamp": "2025-10-31T06:00:00Z", "engine_temp": 85, "oil_pressure": 3.2, "sensor_health": 72}
-            ]
+            "resolution": "raw" if resolution is None else f"{resolution}s",
+            "history": history
         }
     }), 200
 
+# ============= MODEL INFERENCE =============
+@app.route('/api/ml/predict', methods=['POST'])
+def ml_predict():
+    """Failure-risk scores for {"features": [...]} or {"rows": [[...], ...]}"""
+    data = request.get_json(silent=True) or {}
+    rows = data.get('rows') if 'rows' in data else [data.get('features')]
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, list) for row in rows):
+        return jsonify({
+            "status": "error",
+            "message": "Expected {\"features\": [...]} or {\"rows\": [[...], ...]}"
+        }), 400
+    if len(rows) > Config.INFERENCE_MAX_BATCH:
+        return jsonify({
+            "status": "error",
+            "message": f"Too many rows (max {Config.INFERENCE_MAX_BATCH})"
+        }), 413
+
+    try:
+        results = inference.predict_many(rows)
+    except (TimeoutError, WorkerLostError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except (TypeError, ValueError, InferenceError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({
+        "status": "success",
+        "data": results if 'rows' in data else results[0]
+    }), 200
+
+ALERT_ACTIONS = {"CRITICAL": "Schedule maintenance immediately", "HIGH": "Schedule an inspection"}
+record_lock = threading.Lock()
+
+def record_diagnoses(results):
+    """Store diagnoses as predictions, which feed the risk aggregates behind /api/analytics
+
+    A vehicle entering HIGH or CRITICAL risk (or moving between them) also
+    gets an alert and an escalation workflow; repeat diagnoses at the same
+    level do not.
+    """
+    now = datetime.now().isoformat()
+    with record_lock, db.transaction():
+        latest = db.get_analytics()['aggregates'].get('latest_risk', {})
+        db.add_predictions([
+            {
+                "prediction_id": f"PRED_{result['vehicle_id']}_{now}",
+                "vehicle_id": result["vehicle_id"],
+                "timestamp": now,
+                "model": "DiagnosisAgent",
+                "failure_probability": result["failure_probability"],
+                "risk_level": result["risk_level"],
+                "predicted_failures": result["predicted_failures"]
+            }
+            for result in results
+        ])
+        for result in results:
+            vehicle_id, level = result["vehicle_id"], result["risk_level"]
+            if level not in ALERT_ACTIONS or latest.get(vehicle_id, {}).get("risk_level") == level:
+                continue
+            components = ", ".join(f["component"] for f in result["predicted_failures"])
+            message = f"Failure probability {result['failure_probability']}%" + (
+                f" - at risk: {components}" if components else ""
+            )
+            db.add_alert({
+                "alert_id": f"ALT_{vehicle_id}_{now}",
+                "vehicle_id": vehicle_id,
+                "timestamp": now,
+                "severity": level,
+                "message": message,
+                "recommended_action": ALERT_ACTIONS[level],
+                "confidence": result["failure_probability"],
+                "source": "DiagnosisAgent"
+            })
+            db.add_workflow({
+                "workflow_id": f"WF_{vehicle_id}_{now}",
+                "vehicle_id": vehicle_id,
+                "timestamp": now,
+                "status": "completed",
+                "trigger": "DiagnosisAgent",
+                "decision": f"{level} risk alert raised: {ALERT_ACTIONS[level]}"
+            })
+
+@app.route('/api/ml/diagnose/<vehicle_id>', methods=['GET', 'POST'])
+def ml_diagnose(vehicle_id):
+    """Diagnose one vehicle; POST also records the diagnosis (see record_diagnoses)"""
+    try:
+        result = inference.diagnose(vehicle_id, diagnosis_features.row(vehicle_id))
+    except (TimeoutError, WorkerLostError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except InferenceError as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    if request.method == 'POST':
+        record_diagnoses([result])
+    return jsonify({"status": "success", "data": result}), 200
+
+@app.route('/api/ml/diagnose', methods=['GET', 'POST'])
+def ml_diagnose_fleet():
+    """Diagnose every vehicle with telemetry (or ?vehicle_ids=a,b,...) in one pass; POST also records them"""
+    requested = request.args.get('vehicle_ids')
+    if requested:
+        vehicle_ids = [v for v in requested.split(',') if v]
+    else:
+        vehicle_ids = sorted(set(timeseries.vehicles()) | {r["vehicle_id"] for r in ingest.snapshot()["vehicles"]})
+    try:
+        results = inference.diagnose_many(vehicle_ids, diagnosis_features.matrix(vehicle_ids))
+    except (TimeoutError, WorkerLostError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except InferenceError as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    if results and request.method == 'POST':
+        record_diagnoses(results)
+    return jsonify({"status": "success", "count": len(results), "data": results}), 200
+
+@app.route('/api/ml/feedback', methods=['POST'])
+def ml_feedback():
+    """Queue labelled windows for online learning:
+    {"model": "predictor" | "diagnosis", "windows": [{"features": [...] or [[...], ...], "failed": bool}, ...]}
+    Diagnosis windows may give "vehicle_id" instead of "features" to use the vehicle's current telemetry.
+    """
+    data = request.get_json(silent=True) or {}
+    learner = learners.get(data.get('model', 'predictor'))
+    if learner is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Online learning is not enabled for {data.get('model')!r}"
+        }), 400
+    windows = data.get('windows')
+    if not isinstance(windows, list) or not windows or not all(
+        isinstance(w, dict) and isinstance(w.get('failed'), bool)
+        and (isinstance(w.get('features'), list) or (data.get('model') == 'diagnosis' and isinstance(w.get('vehicle_id'), str)))
+        for w in windows
+    ):
+        return jsonify({
+            "status": "error",
+            "message": "Expected {\"windows\": [{\"features\": [...], \"failed\": true|false}, ...]}"
+        }), 400
+    if len(windows) > Config.INGEST_MAX_BATCH:
+        return jsonify({
+            "status": "error",
+            "message": f"Too many windows (max {Config.INGEST_MAX_BATCH})"
+        }), 413
+
+    try:
+        features = [
+            w['features'] if isinstance(w.get('features'), list) else diagnosis_features.row(w['vehicle_id'])
+            for w in windows
+        ]
+        rows = [learner.featurize(f) for f in features]
+        for row in rows:
+            if len(row) != learner.target.model.n_features_in_:
+                raise ValueError(f"expected {learner.target.model.n_features_in_} features, got {len(row)}")
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    pending = learner.observe_batch(rows, [w['failed'] for w in windows])
+    return jsonify({"status": "success", "accepted": len(windows), "pending": pending}), 202
+
+@app.route('/api/ml/status', methods=['GET'])
+def ml_status():
+    return jsonify({
+        "status": "success",
+        "data": dict(
+            inference_service.stats() if inference_service else {"workers": 0, "mode": "in-process"},
+            cache=inference.cache_stats(),
+            online_learning={name: learner.status() for name, learner in learners.items()}
+        )
+    }), 200
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(debug=True, host='0.0.0.0', port=port)
+    # The reloader would re-run this module in a child process and start every service twice
+    start_services().run(debug=True, use_reloader=False, host='0.0.0.0', port=port)
@@ -11,8 +11,55 @@ class Config:
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
     # Database
-    DATABASE_PATH = "data/guardian_db.json"
+    DATABASE_BACKEND = os.getenv('DATABASE_BACKEND', 'json')  # json | journal | sqlite
+    DATABASE_PATH = os.getenv(
+        'DATABASE_PATH',
+        "data/guardian.db" if DATABASE_BACKEND == 'sqlite' else "data/guardian_db.json"
+    )
+    JOURNAL_COMPACT_EVERY = int(os.getenv('JOURNAL_COMPACT_EVERY', 1000))
+    DATABASE_GROUP_COMMIT = os.getenv('DATABASE_GROUP_COMMIT', 'false').lower() == 'true'
+    GROUP_COMMIT_WINDOW_MS = float(os.getenv('GROUP_COMMIT_WINDOW_MS', 5))
     DATA_DIR = "data"
+
+    # Retention (days to keep in the hot database; older records are archived)
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', "data/archive")
+    RETENTION_TTL_DAYS = {
+        "alerts": int(os.getenv('ALERTS_TTL_DAYS', 30)),
+        "workflows": int(os.getenv('WORKFLOWS_TTL_DAYS', 30)),
+        "predictions": int(os.getenv('PREDICTIONS_TTL_DAYS', 7))
+    }
+    RETENTION_INTERVAL_SECONDS = int(os.getenv('RETENTION_INTERVAL_SECONDS', 3600))
+    
+    # Telemetry
+    TELEMETRY_RING_PATH = os.getenv('TELEMETRY_RING_PATH')  # unset = no shared-memory ring
+    TELEMETRY_RING_CAPACITY = int(os.getenv('TELEMETRY_RING_CAPACITY', 60))
+    SIMULATOR_SHARDS = int(os.getenv('SIMULATOR_SHARDS', 1))  # >1 forks ShardedSimulator processes (large fleets only)
+    TELEMETRY_INGEST_DIR = os.getenv('TELEMETRY_INGEST_DIR', "data/telemetry_ingest")
+    INGEST_QUEUE_CAPACITY = int(os.getenv('INGEST_QUEUE_CAPACITY', 50000))
+    INGEST_FLUSH_BATCH = int(os.getenv('INGEST_FLUSH_BATCH', 5000))
+    INGEST_FLUSH_INTERVAL_MS = float(os.getenv('INGEST_FLUSH_INTERVAL_MS', 1000))
+    INGEST_MAX_BATCH = int(os.getenv('INGEST_MAX_BATCH', 10000))  # readings per request
+    TELEMETRY_LOG_DIR = os.getenv(  # written by RealtimeSimulator
+        'TELEMETRY_LOG_DIR', os.path.join(os.path.dirname(__file__), '..', 'data', 'telemetry')
+    )
+    TIMESERIES_DIR = os.getenv('TIMESERIES_DIR', "data/timeseries")
+    TIMESERIES_CHUNK_SIZE = int(os.getenv('TIMESERIES_CHUNK_SIZE', 4096))
+    TIMESERIES_MAX_OPEN_SERIES = int(os.getenv('TIMESERIES_MAX_OPEN_SERIES', 1024))  # vehicles kept in memory
+    HISTORY_MAX_POINTS = int(os.getenv('HISTORY_MAX_POINTS', 500))
+    SSE_HISTORY = int(os.getenv('SSE_HISTORY', 1000))  # events kept for Last-Event-ID resume
+    SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+    
+    # Model inference (worker processes; 0 = score in the API process)
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', os.cpu_count() or 1))
+    INFERENCE_BATCH_WINDOW_MS = float(os.getenv('INFERENCE_BATCH_WINDOW_MS', 2))
+    INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', 256))
+    INFERENCE_TIMEOUT_SECONDS = float(os.getenv('INFERENCE_TIMEOUT_SECONDS', 10))
+    INFERENCE_REFRESH_SECONDS = float(os.getenv('INFERENCE_REFRESH_SECONDS', 1))  # check for published model updates
+    
+    # Online learning from labelled telemetry (POST /api/ml/feedback)
+    ONLINE_LEARNING = os.getenv('ONLINE_LEARNING', 'true').lower() == 'true'
+    ONLINE_UPDATE_INTERVAL_SECONDS = float(os.getenv('ONLINE_UPDATE_INTERVAL_SECONDS', 5))
+    ONLINE_MIN_SAMPLES = int(os.getenv('ONLINE_MIN_SAMPLES', 1000))  # windows learned before the first swap
     
     # Security
     CORS_ORIGINS = ["*"]  # Restrict in production
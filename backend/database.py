@@ -1,18 +1,263 @@
+import base64
+import heapq
 import json
 import os
-from datetime import datetime
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp into a naive datetime (None if missing/invalid)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_bound(value, name):
+    """A since/until query bound as a datetime; ValueError if it is given but not an ISO timestamp"""
+    if value is None or value == "" or isinstance(value, datetime):
+        return value or None
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        raise ValueError(f"Invalid {name}: {value!r} (expected an ISO timestamp)")
+    return parsed
+
+
+def record_timestamp(item):
+    """Timestamp a record is ordered and expired by"""
+    return parse_timestamp(item.get('timestamp') or item.get('created_at'))
+
+
+ID_FIELDS = {
+    "vehicles": "vehicle_id",
+    "workflows": "workflow_id",
+    "alerts": "alert_id",
+    "appointments": "appointment_id",
+    "predictions": "prediction_id"
+}
+
+
+def encode_cursor(key):
+    """Opaque pagination cursor for a (timestamp, tiebreaker) sort key"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor, tiebreaker=str):
+    """(timestamp, tiebreaker) key of a cursor; ValueError unless it is well-formed and of these types"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not (
+        isinstance(key, list) and len(key) == 2 and isinstance(key[0], str)
+        and isinstance(key[1], tiebreaker) and not isinstance(key[1], bool)
+    ):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return tuple(key)
+
+
+def append_op(collection, items, counter=None):
+    """Build an append mutation record"""
+    return {
+        "op": "append",
+        "collection": collection,
+        "items": list(items),
+        "counter": counter
+    }
+
+
+def evict_op(collection, before, keys=None):
+    """Build a mutation record removing records older than `before` (only those in `keys`, if given)"""
+    op = {
+        "op": "evict",
+        "collection": collection,
+        "before": before.isoformat()
+    }
+    if keys is not None:
+        op["keys"] = list(keys)
+    return op
+
+
+def is_expired(item, before):
+    ts = record_timestamp(item)
+    return ts is not None and ts < before
+
+
+def record_key(collection, item):
+    """Identity of a record for targeted eviction: its id, or its whole content if it has none"""
+    value = item.get(ID_FIELDS.get(collection))
+    return f"id:{value}" if value is not None else json.dumps(item, sort_keys=True)
+
+
+SAVINGS_WINDOW_DAYS = 30
+SAVINGS_FIELDS = {"alerts": "potential_savings", "workflows": "estimated_savings"}
+
+
+def _latest_risk(item):
+    probability = item.get('failure_probability', item.get('failure_risk'))
+    level = item.get('risk_level')
+    if level is None and probability is not None:
+        level = "CRITICAL" if probability > 80 else "HIGH" if probability > 60 else "MEDIUM" if probability > 40 else "LOW"
+    # Stored as a JSON object key, so it must already be the string it will read back as
+    level = "UNKNOWN" if level is None else str(level)
+    return {"risk_level": level, "failure_probability": probability, "timestamp": item.get('timestamp')}
+
+
+def savings_of(collection, items):
+    """Total savings field of records in a collection (0 for collections without one)"""
+    field = SAVINGS_FIELDS.get(collection)
+    return sum(item.get(field) or 0 for item in items) if field else 0
+
+
+def update_aggregates(db, collection, items):
+    """Fold newly appended records into the materialized aggregates.
+
+    Cost is proportional to the number of new items, never to history size.
+    """
+    agg = db.setdefault("aggregates", {})
+    analytics = db.setdefault("analytics", {})
+    if collection == "vehicles":
+        agg["total_vehicles"] = agg.get("total_vehicles", 0) + len(items)
+        return
+
+    by_vehicle = agg.setdefault("alerts_by_vehicle", {})
+    by_severity = agg.setdefault("alerts_by_severity", {})
+    predictions = agg.setdefault("predictions_by_vehicle", {})
+    latest = agg.setdefault("latest_risk", {})
+    risk_counts = agg.setdefault("vehicles_by_risk_level", {})
+    savings_by_day = agg.setdefault("savings_by_day", {})
+    savings_field = SAVINGS_FIELDS.get(collection)
+
+    for item in items:
+        vehicle_id = item.get('vehicle_id')
+        if collection == "alerts":
+            severity = item.get('severity') or "unknown"
+            counts = by_vehicle[vehicle_id] = dict(by_vehicle.get(vehicle_id, {}))
+            counts[severity] = counts.get(severity, 0) + 1
+            by_severity[severity] = by_severity.get(severity, 0) + 1
+        elif collection == "predictions":
+            predictions[vehicle_id] = predictions.get(vehicle_id, 0) + 1
+            risk = _latest_risk(item)
+            previous = latest.get(vehicle_id)
+            if previous is None or (risk["timestamp"] or "") >= (previous["timestamp"] or ""):
+                if previous is not None:
+                    level = "UNKNOWN" if previous["risk_level"] is None else str(previous["risk_level"])
+                    risk_counts[level] = risk_counts.get(level, 0) - 1
+                risk_counts[risk["risk_level"]] = risk_counts.get(risk["risk_level"], 0) + 1
+                latest[vehicle_id] = risk
+
+        savings = item.get(savings_field) if savings_field else None
+        ts = record_timestamp(item)
+        if savings and ts is not None:
+            analytics["cost_savings"] = analytics.get("cost_savings", 0) + savings
+            day = ts.date().isoformat()
+            savings_by_day[day] = savings_by_day.get(day, 0) + savings
+
+    if len(savings_by_day) > SAVINGS_WINDOW_DAYS + 1:
+        newest = parse_timestamp(max(savings_by_day))
+        cutoff = (newest - timedelta(days=SAVINGS_WINDOW_DAYS)).date().isoformat()
+        for day in [d for d in savings_by_day if d <= cutoff]:
+            del savings_by_day[day]
+
+
+def rolling_savings(aggregates, now=None):
+    """Savings recorded over the last SAVINGS_WINDOW_DAYS days"""
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=SAVINGS_WINDOW_DAYS)).date().isoformat()
+    return sum(v for (day, v) in aggregates.get("savings_by_day", {}).items() if day > cutoff)
+
+
+def apply_op(db, op):
+    """Apply one mutation record to a database document"""
+    if op["op"] == "append":
+        db.setdefault(op["collection"], []).extend(op["items"])
+        if op.get("counter"):
+            analytics = db.setdefault("analytics", {})
+            analytics[op["counter"]] = analytics.get(op["counter"], 0) + len(op["items"])
+        update_aggregates(db, op["collection"], op["items"])
+    elif op["op"] == "evict":
+        before = parse_timestamp(op["before"])
+        keys = set(op["keys"]) if op.get("keys") is not None else None
+        kept, evicted = [], []
+        for item in db.get(op["collection"], []):
+            expired = is_expired(item, before) and (keys is None or record_key(op["collection"], item) in keys)
+            (evicted if expired else kept).append(item)
+        db[op["collection"]] = kept
+        savings = savings_of(op["collection"], evicted)
+        if savings:
+            # Remembered so rebuild_aggregates can restore the lifetime total from the hot records
+            analytics = db.setdefault("analytics", {})
+            analytics["evicted_savings"] = analytics.get("evicted_savings", 0) + savings
+    else:
+        raise ValueError(f"Unknown database op: {op['op']}")
+
+
+# Aggregate maps each collection's appends update in place
+AGGREGATE_MAPS = {
+    "alerts": ("alerts_by_vehicle", "alerts_by_severity", "savings_by_day"),
+    "predictions": ("predictions_by_vehicle", "latest_risk", "vehicles_by_risk_level"),
+    "workflows": ("savings_by_day",),
+}
+
+
+def apply_ops(db, ops):
+    """Apply mutation records to a new top-level document and return it.
+
+    Appends extend the collection list in place, so an insert costs
+    O(items) however large the collection is; a reader still holding `db`
+    may see the new records at the tail of a list, but never a list being
+    rebuilt (evict builds a new one). Analytics and only the aggregate maps
+    the ops update are shallow-copied, so readers never iterate a dict that
+    is changing underneath them.
+    """
+    new = dict(db)
+    new["analytics"] = dict(db.get("analytics", {}))
+    aggregates = new["aggregates"] = dict(db.get("aggregates", {}))
+    copied = set()
+    for op in ops:
+        if op["op"] == "append":
+            for key in AGGREGATE_MAPS.get(op["collection"], ()):
+                if key not in copied and key in aggregates:
+                    aggregates[key] = dict(aggregates[key])
+                    copied.add(key)
+        apply_op(new, op)
+    return new
+
 
 class Database:
     def __init__(self, filepath="data/guardian_db.json"):
         self.filepath = filepath
+        self._lock = threading.RLock()
+        self._writer = None
+        self._txn = threading.local()
+        self._cache = None
+        self._cache_key = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.version = 0
         self.ensure_exists()
-    
+        self._load()
+        if not self._has_aggregates():
+            # Written before aggregates were materialized: derive them from the records
+            self.rebuild_aggregates()
+
+    def _load(self):
+        """Load persisted state (the JSON file is read lazily)"""
+
+    def _has_aggregates(self):
+        return "aggregates" in self.read()
+
     def ensure_exists(self):
         """Create database if it doesn't exist"""
         os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
         if not os.path.exists(self.filepath):
             self.reset()
-    
+
     def reset(self):
         """Reset database to initial state"""
         initial = {
@@ -23,6 +268,7 @@ class Database:
             "alerts": [],
             "appointments": [],
             "predictions": [],
+            "aggregates": {},
             "analytics": {
                 "total_predictions": 0,
                 "total_alerts": 0,
@@ -32,55 +278,218 @@ class Database:
             }
         }
         self.write(initial)
-    
+
+    def _stat_key(self):
+        st = os.stat(self.filepath)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
     def read(self):
-        """Read entire database"""
-        try:
+        """Read entire database.
+
+        The parsed document is cached and reused until the file's inode,
+        mtime or size changes, so treat the result as read-only.
+        """
+        with self._lock:
+            key = self._stat_key()
+            if self._cache is not None and key == self._cache_key:
+                self.cache_hits += 1
+                return self._cache
+            self.cache_misses += 1
             with open(self.filepath, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    
+                self._cache = json.load(f)
+            self._cache_key = key
+            return self._cache
+
     def write(self, data):
-        """Write entire database"""
+        """Write entire database (temp file + fsync + rename)"""
+        tmp_path = f"{self.filepath}.{os.getpid()}.tmp"
         try:
-            with open(self.filepath, 'w') as f:
-                json.dump(data, f, indent=2)
+            with self._lock:
+                self._cache = None
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.filepath)
+                self._cache = data
+                self._cache_key = self._stat_key()
+                self.version += 1
             return True
         except Exception as e:
             print(f"Error writing database: {e}")
             return False
-    
+
+    def cache_stats(self):
+        """Read cache counters"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": round(self.cache_hits / total, 4) if total else 0.0,
+            "version": self.version
+        }
+
+    def enable_group_commit(self, batch_window=0.005):
+        """Route mutations through a batching writer thread.
+
+        Mutating calls then return a Future instead of a bool.
+        """
+        from db_writer import GroupCommitWriter
+        if self._writer is None:
+            self._writer = GroupCommitWriter(self, batch_window=batch_window)
+        return self._writer
+
+    @contextmanager
+    def transaction(self):
+        """Buffer mutations made in this thread and persist them once on exit.
+
+        Nothing is applied if the block raises. Nested transactions join the
+        outermost one.
+        """
+        if getattr(self._txn, 'ops', None) is not None:
+            yield self
+            return
+        self._txn.ops = []
+        try:
+            yield self
+            ops = self._txn.ops
+        finally:
+            self._txn.ops = None
+        if ops:
+            result = self._commit(ops)
+            if isinstance(result, Future):
+                result.result()
+
+    def _commit(self, ops):
+        """Persist mutation records, via the group-commit writer if enabled"""
+        buffered = getattr(self._txn, 'ops', None)
+        if buffered is not None:
+            buffered.extend(ops)
+            return None
+        if self._writer is not None:
+            return self._writer.submit(ops)
+        return self._persist(ops)
+
+    def close(self):
+        """Flush and stop the group-commit writer, if any"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _persist(self, ops):
+        """Apply mutation records and write them out"""
+        with self._lock:
+            return self.write(apply_ops(self.read(), ops))
+
     def add_vehicle(self, vehicle):
         """Add vehicle to database"""
-        db = self.read()
-        db['vehicles'].append(vehicle)
-        self.write(db)
-    
+        return self._commit([append_op('vehicles', [vehicle])])
+
+    def add_vehicles(self, vehicles):
+        """Add many vehicles in one persist"""
+        return self._commit([append_op('vehicles', vehicles)])
+
     def add_workflow(self, workflow):
         """Add workflow execution"""
-        db = self.read()
-        db['workflows'].append(workflow)
-        db['analytics']['total_predictions'] += 1
-        self.write(db)
-    
+        return self._commit([append_op('workflows', [workflow], 'total_predictions')])
+
     def add_alert(self, alert):
         """Add alert"""
+        return self._commit([append_op('alerts', [alert], 'total_alerts')])
+
+    def add_alerts(self, alerts):
+        """Add many alerts in one persist"""
+        return self._commit([append_op('alerts', alerts, 'total_alerts')])
+
+    def add_prediction(self, prediction):
+        """Add model prediction"""
+        return self._commit([append_op('predictions', [prediction], 'total_predictions')])
+
+    def add_predictions(self, predictions):
+        """Add many predictions in one persist"""
+        return self._commit([append_op('predictions', predictions, 'total_predictions')])
+
+    def get_expired(self, collection, before):
+        """Get records of a collection older than `before`"""
+        return [i for i in self.read().get(collection, []) if is_expired(i, before)]
+
+    def evict(self, collection, before, keys=None):
+        """Remove records of a collection older than `before` (counters are kept)
+
+        With `keys` (record_key values), only those records are removed, e.g.
+        exactly the ones get_expired returned and retention archived.
+        """
+        return self._commit([evict_op(collection, before, keys)])
+
+    def query(self, collection, limit=50, cursor=None, since=None, until=None,
+              vehicle_id=None, severity=None):
+        """Page through a collection newest first.
+
+        Returns {"items": [...], "next_cursor": str | None}; pass next_cursor
+        back to get the following page. `since`/`until` bound the record
+        timestamp as [since, until).
+        """
+        since = parse_bound(since, "since")
+        until = parse_bound(until, "until")
+        after = decode_cursor(cursor) if cursor else None
+        id_field = ID_FIELDS.get(collection)
+
+        def matching():
+            for item in self.read().get(collection, []):
+                if vehicle_id and item.get('vehicle_id') != vehicle_id:
+                    continue
+                if severity and item.get('severity') != severity:
+                    continue
+                ts = record_timestamp(item)
+                if (since or until) and ts is None:
+                    continue
+                if since and ts < since:
+                    continue
+                if until and ts >= until:
+                    continue
+                key = (ts.isoformat() if ts else "", str(item.get(id_field, "")))
+                if after and key >= after:
+                    continue
+                yield key, item
+
+        page = heapq.nlargest(limit + 1, matching(), key=lambda pair: pair[0])
+        next_cursor = encode_cursor(page[limit - 1][0]) if len(page) > limit else None
+        return {"items": [item for (_, item) in page[:limit]], "next_cursor": next_cursor}
+
+    def get_analytics(self):
+        """Global counters plus the materialized aggregates"""
         db = self.read()
-        db['alerts'].append(alert)
-        db['analytics']['total_alerts'] += 1
-        self.write(db)
-    
+        return {
+            "analytics": db.get('analytics', {}),
+            "aggregates": db.get('aggregates', {})
+        }
+
+    def rebuild_aggregates(self):
+        """Recompute aggregates from the hot collections (e.g. after upgrading an old file)
+
+        cost_savings starts from the savings of records retention has already
+        evicted, so it stays a lifetime total.
+        """
+        with self._lock:
+            db = dict(self.read())
+            db['aggregates'] = {}
+            analytics = dict(db.get('analytics', {}))
+            analytics['cost_savings'] = analytics.get('evicted_savings', 0)
+            db['analytics'] = analytics
+            for collection in ID_FIELDS:
+                update_aggregates(db, collection, db.get(collection, []))
+            return self.write(db)
+
     def get_vehicle(self, vehicle_id):
         """Get specific vehicle"""
         db = self.read()
-        return next((v for v in db['vehicles'] if v['vehicle_id'] == vehicle_id), None)
-    
+        return next((v for v in db.get('vehicles', []) if v['vehicle_id'] == vehicle_id), None)
+
     def get_all_vehicles(self):
         """Get all vehicles"""
         db = self.read()
         return db.get('vehicles', [])
-    
+
     def get_alerts(self, severity=None):
         """Get alerts"""
         db = self.read()
@@ -88,3 +497,126 @@ class Database:
         if severity:
             return [a for a in alerts if a['severity'] == severity]
         return alerts
+
+
+class JournaledDatabase(Database):
+    """Database that appends mutations to a journal instead of rewriting the file.
+
+    Reads are served from an in-memory view; the journal is folded into the
+    JSON snapshot every `compact_every` records.
+    """
+
+    def __init__(self, filepath="data/guardian_db.json", compact_every=1000, fsync=False):
+        self.journal_path = filepath + ".journal"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._data = {}
+        self._seq = 0
+        self._pending = 0
+        self._journal = None
+        super().__init__(filepath)
+
+    def _load(self):
+        """Load snapshot and replay journal records written after it"""
+        self._data = Database.read(self)
+        self._seq = self._data.get('journal_seq', 0)
+        self._pending = 0
+        if os.path.exists(self.journal_path):
+            good = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # torn tail from an interrupted append
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    good += len(line)
+                    if record['seq'] <= self._seq:
+                        continue
+                    apply_op(self._data, record['op'])
+                    self._seq = record['seq']
+                    self._pending += 1
+            if good < os.path.getsize(self.journal_path):
+                # Drop the torn tail so the next append starts on a fresh line
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(good)
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, 'a')
+
+    def read(self):
+        """Read entire database (live in-memory view, do not mutate)"""
+        return self._data
+
+    def write(self, data):
+        """Replace entire database and reset the journal"""
+        self._data = data
+        return self.compact()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot"""
+        with self._lock:
+            self._data = dict(self._data, journal_seq=self._seq)
+            if not Database.write(self, self._data):
+                return False
+            if self._journal is not None:
+                self._journal.close()
+            self._journal = open(self.journal_path, 'w')
+            self._pending = 0
+            return True
+
+    def _persist(self, ops):
+        """Append mutation records to the journal and apply them in memory"""
+        with self._lock:
+            # Serialized before anything is applied: appends extend the live lists in place
+            lines = [json.dumps({"seq": self._seq + i, "op": op}) + "\n" for (i, op) in enumerate(ops, 1)]
+            self._journal.write("".join(lines))
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._seq += len(ops)
+            self._data = apply_ops(self._data, ops)
+            self._pending += len(ops)
+            self.version += 1
+            if self._pending >= self.compact_every:
+                return self.compact()
+            return True
+
+    def close(self):
+        """Flush pending writes, compact and release the journal file"""
+        super().close()
+        self.compact()
+        self._journal.close()
+        self._journal = None
+
+
+def create_database_from_config(config):
+    """Create the Database described by a Config class"""
+    options = {}
+    if config.DATABASE_BACKEND == "journal":
+        options["compact_every"] = config.JOURNAL_COMPACT_EVERY
+    return create_database(
+        config.DATABASE_BACKEND,
+        config.DATABASE_PATH,
+        group_commit=config.DATABASE_GROUP_COMMIT,
+        group_commit_window=config.GROUP_COMMIT_WINDOW_MS / 1000,
+        **options
+    )
+
+
+def create_database(backend="json", filepath="data/guardian_db.json", group_commit=False,
+                    group_commit_window=0.005, **options):
+    """Create a Database for the configured storage backend"""
+    if backend == "json":
+        db = Database(filepath)
+    elif backend == "journal":
+        db = JournaledDatabase(filepath, **options)
+    elif backend == "sqlite":
+        from sqlite_database import SQLiteDatabase
+        db = SQLiteDatabase(filepath)
+    else:
+        raise ValueError(f"Unknown database backend: {backend}")
+    if group_commit:
+        db.enable_group_commit(group_commit_window)
+    return db
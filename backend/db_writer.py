@@ -0,0 +1,74 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Single writer thread that batches database mutations.
+
+    Callers submit lists of op records and get a Future back. Everything that
+    arrives within `batch_window` seconds of the first pending op is persisted
+    with one `db._persist()` call, so a burst of inserts costs one write.
+    """
+
+    def __init__(self, db, batch_window=0.005, max_batch=10000):
+        self.db = db
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batches_written = 0
+        self.ops_written = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, ops):
+        """Enqueue mutation records; the Future resolves once they are on disk"""
+        future = Future()
+        self._queue.put((ops, future))
+        return future
+
+    def _drain(self, first):
+        """Collect requests arriving within the batch window"""
+        batch = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.batch_window
+        while count < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+            count += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._drain(first)
+            ops = [op for (item_ops, _) in batch for op in item_ops]
+            try:
+                result = self.db._persist(ops)
+            except Exception as e:
+                for (_, future) in batch:
+                    future.set_exception(e)
+                continue
+            self.batches_written += 1
+            self.ops_written += len(ops)
+            for (_, future) in batch:
+                future.set_result(result)
+
+    def close(self):
+        """Flush pending mutations and stop the writer thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
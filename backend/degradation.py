@@ -0,0 +1,84 @@
+import json
+import os
+
+import numpy as np
+
+SCENARIO_DIR = os.path.join(os.path.dirname(__file__), 'scenarios')
+
+
+def load_scenario(name_or_path=None):
+    """Load a scenario JSON by path or by name from backend/scenarios/"""
+    path = name_or_path or "default"
+    if not os.path.exists(path):
+        path = os.path.join(SCENARIO_DIR, f"{path}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+class DegradationModel:
+    """Per-vehicle degradation curves evaluated for the whole fleet at once.
+
+    A profile is {"rate", "onset", "growth", "max"}: wear starts after
+    `onset` ticks and grows linearly at `rate` per tick, or exponentially
+    when `growth` > 0 (rate * (e^(growth * t) - 1) / growth), capped at `max`.
+    """
+
+    def __init__(self, profile_names, rate, onset, growth, cap):
+        self.profile_names = profile_names
+        self.rate = rate
+        self.onset = onset
+        self.growth = growth
+        self.cap = cap
+
+    @classmethod
+    def from_scenario(cls, scenario, vehicle_ids, seed=None):
+        """Assign profiles: explicit `assignments` first, then a seeded draw from `mix`"""
+        profiles = scenario["profiles"]
+        names = list(profiles)
+        assignments = scenario.get("assignments", {})
+        default = names.index(scenario.get("default_profile", names[0]))
+
+        n = len(vehicle_ids)
+        mix = scenario.get("mix")
+        if mix:
+            rng = np.random.default_rng(seed if seed is not None else scenario.get("seed"))
+            weights = np.array([mix.get(name, 0) for name in names], dtype=np.float64)
+            codes = rng.choice(len(names), size=n, p=weights / weights.sum())
+        else:
+            codes = np.full(n, default)
+        if assignments:
+            positions = {str(vid): i for i, vid in enumerate(vehicle_ids)}
+            for vehicle_id, name in assignments.items():
+                if vehicle_id in positions:
+                    codes[positions[vehicle_id]] = names.index(name)
+
+        def column(key, fallback):
+            values = np.array([profiles[name].get(key, fallback) for name in names], dtype=np.float64)
+            return values[codes]
+
+        return cls(
+            np.array(names)[codes],
+            column("rate", 0.0),
+            column("onset", 0.0),
+            column("growth", 0.0),
+            column("max", np.inf)
+        )
+
+    def take(self, indices):
+        """Model for a subset (or reordering) of the fleet"""
+        return DegradationModel(
+            self.profile_names[indices],
+            self.rate[indices],
+            self.onset[indices],
+            self.growth[indices],
+            self.cap[indices]
+        )
+
+    def at(self, step):
+        """Degradation factor of every vehicle after `step` ticks"""
+        t = np.maximum(0.0, step - self.onset)
+        exponential = np.divide(
+            self.rate * np.expm1(self.growth * t), self.growth,
+            out=self.rate * t, where=self.growth > 0
+        )
+        return np.minimum(exponential, self.cap)
@@ -0,0 +1,146 @@
+from datetime import datetime
+
+import numpy as np
+
+LOCATIONS = ["Delhi", "Mumbai", "Bangalore", "Chennai", "Hyderabad", "Pune", "Kolkata", "Ahmedabad"]
+
+# Scalar telemetry columns carried by every FleetFrame
+COLUMNS = (
+    "engine_temp_celsius",
+    "oil_pressure_bar",
+    "rpm",
+    "fuel_consumption_kmpl",
+    "battery_voltage",
+    "sensor_health",
+    "degradation_factor"
+)
+
+ROUNDING = {
+    "engine_temp_celsius": 2,
+    "oil_pressure_bar": 2,
+    "rpm": 0,
+    "fuel_consumption_kmpl": 2,
+    "battery_voltage": 2,
+    "sensor_health": 2,
+    "degradation_factor": 2
+}
+
+ALERT_LEVELS = np.array(["NORMAL", "WARNING", "CRITICAL"])
+
+
+class FleetFrame:
+    """One fleet-wide telemetry tick stored as column arrays"""
+
+    def __init__(self, timestamp, vehicle_ids, location_codes, columns, tire_pressure, alert_codes, locations=LOCATIONS):
+        self.timestamp = timestamp
+        self.vehicle_ids = vehicle_ids
+        self.location_codes = location_codes
+        self.columns = columns
+        self.tire_pressure = tire_pressure
+        self.alert_codes = alert_codes
+        self.locations = locations
+
+    def __len__(self):
+        return len(self.vehicle_ids)
+
+    @property
+    def alert_status(self):
+        return ALERT_LEVELS[self.alert_codes]
+
+    def to_records(self, indices=None):
+        """Convert (a subset of) the frame to the simulator's dict records"""
+        if indices is None:
+            indices = range(len(self))
+        rounded = {name: np.round(values, ROUNDING[name]).tolist() for name, values in self.columns.items()}
+        tires = np.round(self.tire_pressure, 2).tolist()
+        timestamp = self.timestamp.isoformat()
+        records = []
+        for i in indices:
+            records.append({
+                "vehicle_id": str(self.vehicle_ids[i]),
+                "timestamp": timestamp,
+                "engine_temp_celsius": rounded["engine_temp_celsius"][i],
+                "oil_pressure_bar": rounded["oil_pressure_bar"][i],
+                "rpm": rounded["rpm"][i],
+                "fuel_consumption_kmpl": rounded["fuel_consumption_kmpl"][i],
+                "battery_voltage": rounded["battery_voltage"][i],
+                "tire_pressure_psi": tires[i],
+                "sensor_health": rounded["sensor_health"][i],
+                "location": self.locations[self.location_codes[i]],
+                "alert_status": str(ALERT_LEVELS[self.alert_codes[i]]),
+                "degradation_factor": rounded["degradation_factor"][i]
+            })
+        return records
+
+
+class FleetTelemetryGenerator:
+    """Vectorized telemetry generator for a whole fleet.
+
+    Per-vehicle base parameters live in NumPy arrays; `tick()` produces every
+    vehicle's reading in one pass for a given degradation (see degradation.py).
+    """
+
+    def __init__(self, vehicle_ids, base_temp, base_pressure, location_codes, seed=None):
+        self.vehicle_ids = np.asarray(vehicle_ids)
+        self.base_temp = np.asarray(base_temp, dtype=np.float64)
+        self.base_pressure = np.asarray(base_pressure, dtype=np.float64)
+        self.location_codes = np.asarray(location_codes, dtype=np.int16)
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return len(self.vehicle_ids)
+
+    @classmethod
+    def from_vehicles(cls, vehicles, fleet_size=None, seed=None):
+        """Build from RealtimeSimulator-style metadata, padded with synthetic vehicles"""
+        rng = np.random.default_rng(seed)
+        ids = list(vehicles)
+        base_temp = [v.get('base_temp', 85) for v in vehicles.values()]
+        base_pressure = [v.get('base_pressure', 4.5) for v in vehicles.values()]
+        locations = [LOCATIONS.index(v['location']) if v.get('location') in LOCATIONS else 0
+                     for v in vehicles.values()]
+
+        extra = max(0, (fleet_size or 0) - len(ids))
+        if extra:
+            next_id = 1001 + len(ids)
+            ids = np.concatenate([np.array(ids), np.char.add("VH", np.arange(next_id, next_id + extra).astype(str))])
+            base_temp = np.concatenate([base_temp, rng.normal(85, 2, extra)])
+            base_pressure = np.concatenate([base_pressure, rng.normal(4.5, 0.15, extra)])
+            locations = np.concatenate([locations, rng.integers(0, len(LOCATIONS), extra)])
+        return cls(ids, base_temp, base_pressure, locations, seed=rng.integers(2 ** 32))
+
+    def take(self, indices, seed=None):
+        """Generator for a subset (or reordering) of the fleet"""
+        return FleetTelemetryGenerator(
+            self.vehicle_ids[indices],
+            self.base_temp[indices],
+            self.base_pressure[indices],
+            self.location_codes[indices],
+            seed=seed if seed is not None else self.rng.integers(2 ** 32)
+        )
+
+    def tick(self, degradation, timestamp=None):
+        """Generate one reading per vehicle; `degradation` is a scalar or per-vehicle array"""
+        n = len(self)
+        rng = self.rng
+        degradation = np.broadcast_to(np.asarray(degradation, dtype=np.float64), (n,))
+
+        sensor_health = np.maximum(0, 100 - degradation * 50)
+        columns = {
+            "engine_temp_celsius": self.base_temp + rng.normal(5, 3, n) + degradation * 10,
+            "oil_pressure_bar": self.base_pressure + rng.normal(0, 0.3, n) - degradation * 0.5,
+            "rpm": 2500 + rng.normal(500, 200, n),
+            "fuel_consumption_kmpl": 12 + rng.normal(-2, 1, n),
+            "battery_voltage": 12.6 + rng.normal(0.2, 0.1, n),
+            "sensor_health": sensor_health,
+            "degradation_factor": degradation
+        }
+        alert_codes = (sensor_health < 60).astype(np.int8) + (sensor_health < 40)
+        return FleetFrame(
+            timestamp or datetime.now(),
+            self.vehicle_ids,
+            self.location_codes,
+            columns,
+            32 + rng.normal(0, 1, (n, 4)),
+            alert_codes
+        )
@@ -0,0 +1,248 @@
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from fleet_telemetry import ALERT_LEVELS, COLUMNS, LOCATIONS, ROUNDING, FleetFrame
+from telemetry_ring import RING_COLUMNS
+
+CODEC_VERSION = 1
+
+# A stream is a sequence of blocks: kind (u8), payload length (u32), zlib payload
+HEADER, KEYFRAME, DELTA = 0, 1, 2
+BLOCK = struct.Struct("<BI")
+
+# Frame payload: timestamp (epoch seconds), vehicle count, then one packed column per RING_COLUMNS
+FRAME_PREFIX = struct.Struct("<dI")
+
+# Values are stored as integers in units of 10^-decimals; NaN maps to MISSING
+SCALES = np.array([10 ** ROUNDING[name] for name in COLUMNS] + [100] * 4 + [1], dtype=np.float64)
+MISSING = -(2 ** 31)
+DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+CONTENT_TYPE = "application/x-guardian-frames"
+
+
+def frame_matrix(frame):
+    """(len(RING_COLUMNS), n) float matrix of a FleetFrame"""
+    matrix = np.empty((len(RING_COLUMNS), len(frame)))
+    for row, name in enumerate(COLUMNS):
+        matrix[row] = frame.columns[name]
+    base = len(COLUMNS)
+    matrix[base:base + 4] = frame.tire_pressure.T
+    matrix[base + 4] = frame.alert_codes
+    return matrix
+
+
+def _quantize(matrix):
+    with np.errstate(invalid='ignore'):
+        scaled = np.round(matrix * SCALES[:, None])
+    return np.where(np.isnan(scaled), MISSING, scaled).astype(np.int64)
+
+
+def _pack_column(values):
+    """Smallest signed dtype that holds the column, prefixed by its code"""
+    lo, hi = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    for code, dtype in enumerate(DTYPES):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return bytes([code]) + values.astype(dtype).tobytes()
+
+
+def _unpack_columns(payload, offset, n):
+    columns = []
+    for _ in RING_COLUMNS:
+        dtype = np.dtype(DTYPES[payload[offset]])
+        offset += 1
+        columns.append(np.frombuffer(payload, dtype=dtype, count=n, offset=offset).astype(np.int64))
+        offset += n * dtype.itemsize
+    return np.array(columns)
+
+
+def _block(kind, payload, level):
+    compressed = zlib.compress(payload, level)
+    return BLOCK.pack(kind, len(compressed)) + compressed
+
+
+class FrameEncoder:
+    """Encodes FleetFrames for one fleet into a compact block stream.
+
+    The header block (vehicle ids, locations, column scales) is written once.
+    Each tick is quantized to the JSON precision (ROUNDING), delta-encoded
+    against the previous tick per column (keyframes are delta-encoded across
+    vehicles instead), packed into the narrowest integer type and zlib
+    compressed. A keyframe every `keyframe_interval` ticks lets readers join
+    mid-stream.
+    """
+
+    def __init__(self, vehicle_ids, location_codes, locations=LOCATIONS, keyframe_interval=60, level=6):
+        self.vehicle_ids = [str(v) for v in vehicle_ids]
+        self.location_codes = np.asarray(location_codes)
+        self.locations = list(locations)
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self._previous = None
+        self._count = 0
+
+    @classmethod
+    def for_frame(cls, frame, **options):
+        return cls(frame.vehicle_ids, frame.location_codes, frame.locations, **options)
+
+    def header(self):
+        return _block(HEADER, json.dumps({
+            "version": CODEC_VERSION,
+            "columns": list(RING_COLUMNS),
+            "scales": SCALES.tolist(),
+            "vehicle_ids": self.vehicle_ids,
+            "locations": self.locations,
+            "location_codes": self.location_codes.tolist()
+        }, separators=(",", ":")).encode(), self.level)
+
+    def encode(self, frame):
+        """One frame block (keyframe or delta)"""
+        values = _quantize(frame_matrix(frame))
+        keyframe = self._previous is None or self._count % self.keyframe_interval == 0
+        if keyframe:
+            deltas = np.diff(values, axis=1, prepend=0)
+        else:
+            deltas = values - self._previous
+        self._previous = values
+        self._count += 1
+        payload = FRAME_PREFIX.pack(frame.timestamp.timestamp(), len(frame.vehicle_ids))
+        payload += b"".join(_pack_column(column) for column in deltas)
+        return _block(KEYFRAME if keyframe else DELTA, payload, self.level)
+
+
+class FrameDecoder:
+    """Stateful decoder for a block stream; yields FleetFrames"""
+
+    def __init__(self):
+        self.header = None
+        self._previous = None
+
+    def decode_block(self, kind, payload):
+        """Decode one block; returns a FleetFrame, or None for headers and unusable deltas"""
+        payload = zlib.decompress(payload)
+        if kind == HEADER:
+            self.header = json.loads(payload)
+            self.location_codes = np.array(self.header["location_codes"], dtype=np.int64)
+            self._previous = None
+            return None
+        if self.header is None or (kind == DELTA and self._previous is None):
+            return None  # joined mid-stream: wait for the next keyframe
+        timestamp, n = FRAME_PREFIX.unpack_from(payload)
+        deltas = _unpack_columns(payload, FRAME_PREFIX.size, n)
+        values = np.cumsum(deltas, axis=1) if kind == KEYFRAME else self._previous + deltas
+        self._previous = values
+        return self._to_frame(timestamp, values)
+
+    def _to_frame(self, timestamp, values):
+        matrix = np.where(values == MISSING, np.nan, values / SCALES[:, None])
+        base = len(COLUMNS)
+        return FleetFrame(
+            datetime.fromtimestamp(timestamp),
+            self.header["vehicle_ids"],
+            self.location_codes,
+            {name: matrix[row] for row, name in enumerate(COLUMNS)},
+            matrix[base:base + 4].T,
+            np.nan_to_num(matrix[base + 4]).astype(np.int8),
+            self.header["locations"]
+        )
+
+    def decode(self, data):
+        """Decode every complete block in `data`"""
+        frames = []
+        for kind, payload in iter_blocks(data):
+            frame = self.decode_block(kind, payload)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+
+def iter_blocks(data):
+    """(kind, payload) for each complete block; a torn trailing block is ignored"""
+    offset = 0
+    while offset + BLOCK.size <= len(data):
+        kind, length = BLOCK.unpack_from(data, offset)
+        start = offset + BLOCK.size
+        if start + length > len(data):
+            break
+        yield kind, data[start:start + length]
+        offset = start + length
+
+
+def records_to_frame(records, timestamp=None):
+    """FleetFrame from reading dicts (missing values become NaN, unknown locations are added)"""
+    locations = list(LOCATIONS)
+    location_codes = []
+    for record in records:
+        location = record.get("location") or locations[0]
+        if location not in locations:
+            locations.append(location)
+        location_codes.append(locations.index(location))
+
+    def column(name):
+        return np.array([np.nan if r.get(name) is None else r[name] for r in records], dtype=np.float64)
+
+    tires = np.full((len(records), 4), np.nan)
+    for i, record in enumerate(records):
+        psi = record.get("tire_pressure_psi")
+        if isinstance(psi, list) and len(psi) == 4:
+            tires[i] = psi
+    levels = list(ALERT_LEVELS)
+    alert_codes = np.array(
+        [levels.index(r["alert_status"]) if r.get("alert_status") in levels else 0 for r in records],
+        dtype=np.int8
+    )
+    return FleetFrame(
+        timestamp or datetime.now(),
+        [r["vehicle_id"] for r in records],
+        np.array(location_codes, dtype=np.int64),
+        {name: column(name) for name in COLUMNS},
+        tires,
+        alert_codes,
+        locations
+    )
+
+
+def encode_records(records, timestamp=None, level=6):
+    """Self-contained stream (header + keyframe) for a list of reading dicts"""
+    frame = records_to_frame(records, timestamp)
+    encoder = FrameEncoder.for_frame(frame, level=level)
+    return encoder.header() + encoder.encode(frame)
+
+
+def decode_stream(data):
+    """FleetFrames from a complete stream"""
+    return FrameDecoder().decode(data)
+
+
+class CompactFrameWriter:
+    """Appends encoded frames to a file (header written once per writer)"""
+
+    def __init__(self, path, keyframe_interval=60, level=6):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.encoder = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, 'ab')
+
+    def append(self, frame):
+        if self.encoder is None:
+            self.encoder = FrameEncoder.for_frame(frame, keyframe_interval=self.keyframe_interval, level=self.level)
+            self._file.write(self.encoder.header())
+        self._file.write(self.encoder.encode(frame))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_frames(path):
+    """Decode every frame in a file written by CompactFrameWriter"""
+    with open(path, 'rb') as f:
+        return decode_stream(f.read())
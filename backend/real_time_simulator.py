@@ -1,14 +1,20 @@
-import json
 import random
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 import threading
-import os
+
+from config import Config
+from degradation import DegradationModel, load_scenario
+from fleet_telemetry import FleetTelemetryGenerator
+from frame_codec import CompactFrameWriter
+from telemetry_log import TelemetryLog
+from telemetry_ring import TelemetryRing
 
 class RealtimeSimulator:
     """Simulates real-time vehicle telemetry data"""
     
-    def __init__(self):
+    def __init__(self, fleet_size=None, seed=None, segment_max_bytes=64 * 1024 * 1024,
+                 ring_path=None, ring_capacity=None, scenario=None, compact_path=None, log_dir=None):
         self.vehicles = {
             "VH1001": {
                 "owner": "Owner 1",
@@ -33,11 +39,26 @@ class RealtimeSimulator:
             }
         }
         
-        self.data_file = os.path.join(
-            os.path.dirname(__file__), 
-            '..', 'data', 'telemetry_stream.json'
-        )
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+        # Append-only, segment-rotated telemetry log (read with TelemetryLogReader); the API follows TELEMETRY_LOG_DIR
+        self.log_dir = log_dir or Config.TELEMETRY_LOG_DIR
+        self.segment_max_bytes = segment_max_bytes
+        self.log = None
+        
+        # Optional shared-memory ring for zero-copy readers (TelemetryRing.open)
+        self.ring_path = ring_path or Config.TELEMETRY_RING_PATH
+        self.ring_capacity = ring_capacity or Config.TELEMETRY_RING_CAPACITY
+        self.ring = None
+        
+        # Optional delta-encoded, compressed frame file (frame_codec.read_frames)
+        self.compact_path = compact_path
+        self.compact = None
+        
+        # Vectorized generator: the vehicles above plus synthetic ones up to fleet_size
+        self.fleet = FleetTelemetryGenerator.from_vehicles(self.vehicles, fleet_size, seed=seed)
+        
+        # Degradation curves per vehicle come from the scenario profiles (scenarios/*.json)
+        self.scenario = scenario if isinstance(scenario, dict) else load_scenario(scenario)
+        self.degradation = DegradationModel.from_scenario(self.scenario, self.fleet.vehicle_ids, seed)
     
     def generate_telemetry(self, vehicle_id, degradation_factor=0.5):
         """Generate realistic telemetry data with degradation"""
@@ -77,50 +98,76 @@ class RealtimeSimulator:
             "degradation_factor": round(degradation_factor, 2)
         }
     
-    def stream_telemetry(self, duration_seconds=3600, interval=5):
-        """Continuously stream telemetry data"""
+    def generate_fleet_telemetry(self, step):
+        """Generate one tick for the whole fleet as a column-oriented FleetFrame"""
+        return self.fleet.tick(self.degradation.at(step))
+    
+    def open_sinks(self):
+        """Open the telemetry log (and the shared-memory ring / compact frame file, if configured)"""
+        if self.log is None:
+            self.log = TelemetryLog(self.log_dir, self.segment_max_bytes)
+        if self.ring_path and self.ring is None:
+            self.ring = TelemetryRing.create(self.ring_path, self.fleet.vehicle_ids, self.ring_capacity)
+        if self.compact_path and self.compact is None:
+            self.compact = CompactFrameWriter(self.compact_path)
+    
+    def publish(self, frame, step):
+        """Hand one frame to every downstream consumer"""
+        if self.ring is not None:
+            self.ring.write_frame(frame)
+        if self.compact is not None:
+            self.compact.append(frame)
+        self.log.append({
+            "timestamp": frame.timestamp.isoformat(),
+            "vehicles": frame.to_records(),
+            "update_count": step
+        })
+    
+    def stream_telemetry(self, duration_seconds=3600, interval=5, sharded=None):
+        """Continuously stream telemetry data
+        
+        With a started ShardedSimulator built on this simulator, ticks are
+        generated by its shard processes; publishing stays in this process.
+        """
         start_time = time.time()
         step = 0
         
         print("🔴 Starting real-time telemetry stream...")
+        self.open_sinks()
         
-        while (time.time() - start_time) < duration_seconds:
-            try:
-                stream_data = []
-                
-                # Generate data for all vehicles
-                for vehicle_id in self.vehicles.keys():
-                    # VH1001 degrades faster (bearing issue)
-                    if vehicle_id == "VH1001":
-                        degradation = (step / 200) * 0.8  # Fast degradation
-                    else:
-                        degradation = (step / 500) * 0.3  # Slow degradation
+        try:
+            while (time.time() - start_time) < duration_seconds:
+                try:
+                    # Generate data for all vehicles (VH1001 degrades faster - bearing issue)
+                    frame = sharded.tick(step) if sharded is not None else self.generate_fleet_telemetry(step)
+                    self.publish(frame, step)
                     
-                    telemetry = self.generate_telemetry(vehicle_id, degradation)
-                    stream_data.append(telemetry)
-                
-                # Save to file (Streamlit will read this)
-                with open(self.data_file, 'w') as f:
-                    json.dump({
-                        "timestamp": datetime.now().isoformat(),
-                        "vehicles": stream_data,
-                        "update_count": step
-                    }, f, indent=2)
-                
-                print(f"  📊 Update {step}: Generated data for {len(stream_data)} vehicles")
-                
-                time.sleep(interval)
-                step += 1
-                
-            except Exception as e:
-                print(f"  ❌ Error: {e}")
-                time.sleep(interval)
+                    print(f"  📊 Update {step}: Generated data for {len(frame)} vehicles")
+                    
+                    time.sleep(interval)
+                    step += 1
+                    
+                except Exception as e:
+                    print(f"  ❌ Error: {e}")
+                    time.sleep(interval)
+        finally:
+            if sharded is not None:
+                sharded.stop()
     
-    def start_background_stream(self):
-        """Start streaming in background thread"""
-        thread = threading.Thread(target=self.stream_telemetry, daemon=True)
+    def start_background_stream(self, shards=None):
+        """Start streaming in background thread
+        
+        `shards` (default Config.SIMULATOR_SHARDS) above 1 generates ticks
+        in that many processes, forked here before the stream thread starts.
+        """
+        shards = Config.SIMULATOR_SHARDS if shards is None else shards
+        sharded = None
+        if shards > 1:
+            from sharded_simulator import ShardedSimulator  # it imports this module
+            sharded = ShardedSimulator(shards, simulator=self).start()
+        thread = threading.Thread(target=self.stream_telemetry, kwargs={"sharded": sharded}, daemon=True)
         thread.start()
-        print("✓ Background telemetry stream started")
+        print(f"✓ Background telemetry stream started ({shards} shard{'s' if shards != 1 else ''})")
         return thread
 
 # For standalone testing
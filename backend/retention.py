@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+from database import parse_timestamp, record_key, record_timestamp
+
+DEFAULT_TTL_DAYS = {
+    "alerts": 30,
+    "workflows": 30,
+    "predictions": 7
+}
+
+
+class RetentionManager:
+    """Moves expired records out of the hot database into daily archive segments.
+
+    Expired records are appended to `<archive_dir>/<collection>/<YYYY-MM-DD>.jsonl`
+    (fsynced) before they are evicted, so a crash can duplicate but never lose
+    a record. Eviction names exactly the archived records, so one written
+    (e.g. backfilled) with an old timestamp in between is left for the next
+    run instead of being dropped unarchived. Analytics counters are left
+    untouched by eviction; the savings of evicted records are tallied so
+    rebuild_aggregates keeps the lifetime total.
+    """
+
+    def __init__(self, db, archive_dir="data/archive", ttl_days=None):
+        self.db = db
+        self.archive_dir = archive_dir
+        self.ttl_days = dict(DEFAULT_TTL_DAYS if ttl_days is None else ttl_days)
+
+    def _segment_path(self, collection, day):
+        return os.path.join(self.archive_dir, collection, f"{day}.jsonl")
+
+    def _archive(self, collection, records):
+        """Append records to their daily segments"""
+        by_day = {}
+        for record in records:
+            day = record_timestamp(record).date().isoformat()
+            by_day.setdefault(day, []).append(record)
+
+        os.makedirs(os.path.join(self.archive_dir, collection), exist_ok=True)
+        for day, items in by_day.items():
+            with open(self._segment_path(collection, day), 'a') as f:
+                f.write("".join(json.dumps(i) + "\n" for i in items))
+                f.flush()
+                os.fsync(f.fileno())
+        return sorted(by_day)
+
+    def compact(self, now=None):
+        """Archive and evict every record past its collection's TTL"""
+        now = now or datetime.now()
+        summary = {}
+        for collection, days in self.ttl_days.items():
+            if days is None:
+                continue
+            cutoff = now - timedelta(days=days)
+            expired = self.db.get_expired(collection, cutoff)
+            if not expired:
+                continue
+            segments = self._archive(collection, expired)
+            result = self.db.evict(collection, cutoff, [record_key(collection, r) for r in expired])
+            if isinstance(result, Future):
+                result.result()
+            summary[collection] = {"archived": len(expired), "segments": segments}
+        return summary
+
+    def list_segments(self, collection):
+        """Archived days for a collection, oldest first"""
+        directory = os.path.join(self.archive_dir, collection)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(directory) if name.endswith(".jsonl"))
+
+    def query_archive(self, collection, since=None, until=None, vehicle_id=None, severity=None):
+        """Yield archived records, opening only the segments inside [since, until)"""
+        since = parse_timestamp(since) if isinstance(since, str) else since
+        until = parse_timestamp(until) if isinstance(until, str) else until
+        for day in self.list_segments(collection):
+            if since and day < since.date().isoformat():
+                continue
+            if until and day > until.date().isoformat():
+                break
+            with open(self._segment_path(collection, day), 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    ts = record_timestamp(record)
+                    if since and ts < since:
+                        continue
+                    if until and ts >= until:
+                        continue
+                    if vehicle_id and record.get('vehicle_id') != vehicle_id:
+                        continue
+                    if severity and record.get('severity') != severity:
+                        continue
+                    yield record
+
+    def run_forever(self, interval=3600):
+        """Compact periodically"""
+        while True:
+            try:
+                summary = self.compact()
+                if summary:
+                    print(f"  🗄️ Retention: {summary}")
+            except Exception as e:
+                print(f"  ❌ Retention error: {e}")
+            time.sleep(interval)
+
+    def start_background(self, interval=3600):
+        """Start periodic compaction in a background thread"""
+        thread = threading.Thread(target=self.run_forever, args=(interval,), daemon=True)
+        thread.start()
+        print("✓ Background retention started")
+        return thread
@@ -0,0 +1,94 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from degradation import load_scenario
+from real_time_simulator import RealtimeSimulator
+
+
+class ScenarioEngine:
+    """Deterministic, time-accelerated replay of a fleet scenario.
+
+    Telemetry is stamped with simulated time (scenario `start` plus
+    `tick_seconds` per step), so a given scenario and seed always produce the
+    same frames regardless of how fast the run goes. Frames go to the same
+    consumers as the live simulator (`RealtimeSimulator.publish`) unless
+    other sinks are passed.
+    """
+
+    def __init__(self, scenario=None, seed=None, simulator=None, **simulator_options):
+        self.scenario = scenario if isinstance(scenario, dict) else load_scenario(scenario)
+        self.seed = seed if seed is not None else self.scenario.get("seed", 0)
+        self.simulator = simulator or RealtimeSimulator(
+            fleet_size=self.scenario.get("fleet_size"),
+            seed=self.seed,
+            scenario=self.scenario,
+            **simulator_options
+        )
+        self.tick_seconds = self.scenario.get("tick_seconds", 5)
+        self.start = datetime.fromisoformat(self.scenario.get("start", "2025-01-01T00:00:00"))
+
+    def frame_at(self, step):
+        """Generate the frame for simulated tick `step`"""
+        simulator = self.simulator
+        timestamp = self.start + timedelta(seconds=step * self.tick_seconds)
+        return simulator.fleet.tick(simulator.degradation.at(step), timestamp=timestamp)
+
+    def run(self, ticks=None, duration_seconds=None, speedup=None, sinks=None, start_step=0):
+        """Replay `ticks` steps (or `duration_seconds` of simulated time).
+
+        speedup=None runs as fast as possible; speedup=60 plays one simulated
+        minute per wall-clock second.
+        """
+        if ticks is None:
+            ticks = int(duration_seconds // self.tick_seconds)
+        if sinks is None:
+            self.simulator.open_sinks()
+            sinks = [self.simulator.publish]
+
+        wall_start = time.perf_counter()
+        for i in range(ticks):
+            step = start_step + i
+            frame = self.frame_at(step)
+            for sink in sinks:
+                sink(frame, step)
+            if speedup:
+                delay = (i + 1) * self.tick_seconds / speedup - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+
+        wall_seconds = time.perf_counter() - wall_start
+        simulated_seconds = ticks * self.tick_seconds
+        return {
+            "scenario": self.scenario.get("name"),
+            "vehicles": len(self.simulator.fleet),
+            "ticks": ticks,
+            "simulated_seconds": simulated_seconds,
+            "wall_seconds": round(wall_seconds, 3),
+            "speedup": round(simulated_seconds / wall_seconds, 1) if wall_seconds else None
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a telemetry scenario")
+    parser.add_argument("scenario", nargs="?", default="default", help="name in scenarios/ or path to JSON")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--ticks", type=int)
+    parser.add_argument("--days", type=float, default=1.0, help="simulated days when --ticks is not given")
+    parser.add_argument("--speedup", type=float, help="simulated seconds per wall second (default: max speed)")
+    parser.add_argument("--ring", help="also publish to a shared-memory ring at this path")
+    parser.add_argument("--compact", help="also write delta-encoded compressed frames to this file")
+    parser.add_argument("--no-log", action="store_true", help="skip the JSONL telemetry log")
+    args = parser.parse_args()
+
+    engine = ScenarioEngine(args.scenario, seed=args.seed, ring_path=args.ring, compact_path=args.compact)
+    sinks = None
+    if args.no_log:
+        engine.simulator.open_sinks()
+        ring, compact = engine.simulator.ring, engine.simulator.compact
+        sinks = []
+        if ring is not None:
+            sinks.append(lambda frame, step: ring.write_frame(frame))
+        if compact is not None:
+            sinks.append(lambda frame, step: compact.append(frame))
+    print(engine.run(ticks=args.ticks, duration_seconds=args.days * 86400, speedup=args.speedup, sinks=sinks))
@@ -0,0 +1,149 @@
+import multiprocessing as mp
+import time
+import zlib
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from fleet_telemetry import COLUMNS, FleetFrame
+from real_time_simulator import RealtimeSimulator
+
+# Output rows in shared memory: scalar columns, four tyres, alert code
+N_ROWS = len(COLUMNS) + 5
+
+
+def shard_of(vehicle_id, shards):
+    """Stable shard for a vehicle id (same in every process, unlike hash())"""
+    return zlib.crc32(str(vehicle_id).encode()) % shards
+
+
+def _shard_main(conn, shm_name, n_total, lo, hi, fleet, degradation):
+    """Shard worker: generate its slice of every tick straight into shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    out = None
+    try:
+        out = np.ndarray((N_ROWS, n_total), dtype=np.float64, buffer=shm.buf)[:, lo:hi]
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            step, timestamp = message
+            frame = fleet.tick(degradation.at(step), timestamp)
+            for row, name in enumerate(COLUMNS):
+                out[row] = frame.columns[name]
+            out[len(COLUMNS):len(COLUMNS) + 4] = frame.tire_pressure.T
+            out[-1] = frame.alert_codes
+            conn.send(step)
+    finally:
+        del out
+        shm.close()
+
+
+class ShardedSimulator:
+    """Splits the fleet across worker processes by vehicle_id hash.
+
+    The fleet is reordered so each shard owns a contiguous slice; shards write
+    their readings into one shared-memory block and the parent publishes a
+    synchronized FleetFrame once every shard has finished the tick. Output is
+    reproducible for a given seed and shard count.
+    """
+
+    def __init__(self, shards=None, fleet_size=None, seed=None, scenario=None, simulator=None, **simulator_options):
+        self.shards = shards or mp.cpu_count()
+        self.simulator = simulator or RealtimeSimulator(
+            fleet_size=fleet_size, seed=seed, scenario=scenario, **simulator_options
+        )
+        sim = self.simulator
+
+        shard_ids = np.array([shard_of(v, self.shards) for v in sim.fleet.vehicle_ids])
+        order = np.argsort(shard_ids, kind="stable")
+        sim.fleet = sim.fleet.take(order)
+        sim.degradation = sim.degradation.take(order)
+        bounds = np.searchsorted(shard_ids[order], np.arange(self.shards + 1))
+        self.slices = [(int(bounds[i]), int(bounds[i + 1])) for i in range(self.shards)]
+
+        seeds = np.random.SeedSequence(seed).spawn(self.shards)
+        self._shard_args = [
+            (lo, hi, sim.fleet.take(np.arange(lo, hi), seed=seeds[i]), sim.degradation.take(np.arange(lo, hi)))
+            for i, (lo, hi) in enumerate(self.slices)
+        ]
+        self._shm = None
+        self._workers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Allocate the shared frame buffer and launch one process per shard"""
+        n = len(self.simulator.fleet)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, N_ROWS * n * 8))
+        self.buffer = np.ndarray((N_ROWS, n), dtype=np.float64, buffer=self._shm.buf)
+        for (lo, hi, fleet, degradation) in self._shard_args:
+            parent, child = mp.Pipe()
+            process = mp.Process(
+                target=_shard_main,
+                args=(child, self._shm.name, n, lo, hi, fleet, degradation),
+                daemon=True
+            )
+            process.start()
+            self._workers.append((process, parent))
+        return self
+
+    def tick(self, step, timestamp=None):
+        """Generate one fleet tick across all shards.
+
+        The frame's columns view shared memory and are overwritten by the next tick.
+        """
+        timestamp = timestamp or datetime.now()
+        for (_, conn) in self._workers:
+            conn.send((step, timestamp))
+        for (_, conn) in self._workers:
+            conn.recv()
+        buffer = self.buffer
+        columns = {name: buffer[row] for row, name in enumerate(COLUMNS)}
+        return FleetFrame(
+            timestamp,
+            self.simulator.fleet.vehicle_ids,
+            self.simulator.fleet.location_codes,
+            columns,
+            buffer[len(COLUMNS):len(COLUMNS) + 4].T,
+            buffer[-1].astype(np.int8)
+        )
+
+    def run(self, ticks, sinks=None, tick_seconds=5, start=None):
+        """Generate `ticks` frames as fast as possible and hand each to the sinks"""
+        if sinks is None:
+            self.simulator.open_sinks()
+            sinks = [self.simulator.publish]
+        start = start or datetime.now()
+        wall_start = time.perf_counter()
+        for step in range(ticks):
+            frame = self.tick(step, start + timedelta(seconds=step * tick_seconds))
+            for sink in sinks:
+                sink(frame, step)
+        wall_seconds = time.perf_counter() - wall_start
+        return {
+            "shards": self.shards,
+            "vehicles": len(self.simulator.fleet),
+            "ticks": ticks,
+            "wall_seconds": round(wall_seconds, 3),
+            "ticks_per_second": round(ticks / wall_seconds, 2) if wall_seconds else None
+        }
+
+    def stop(self):
+        """Stop the shard processes and release shared memory"""
+        for (process, conn) in self._workers:
+            conn.send(None)
+        for (process, conn) in self._workers:
+            process.join(timeout=5)
+            conn.close()
+        self._workers = []
+        if self._shm is not None:
+            self.buffer = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+
+from database import (
+    Database, decode_cursor, encode_cursor, parse_bound, record_key, record_timestamp, savings_of,
+    update_aggregates
+)
+
+COLLECTIONS = ("vehicles", "workflows", "alerts", "appointments", "predictions")
+
+
+def _timestamp_of(item):
+    """Normalized timestamp column so string comparison orders correctly"""
+    ts = record_timestamp(item)
+    return ts.isoformat() if ts else None
+
+
+class SQLiteDatabase(Database):
+    """Database backed by sqlite3 (WAL mode) with indexed lookups.
+
+    Each collection is a table holding the original record as JSON plus the
+    indexed columns (vehicle_id, severity, normalized timestamp). Analytics counters and
+    document metadata live in a key/value `meta` table.
+    """
+
+    def __init__(self, filepath="data/guardian.db"):
+        self._local = threading.local()
+        super().__init__(filepath)
+
+    def _conn(self):
+        """Per-thread connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filepath, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ensure_exists(self):
+        """Create database file and schema if they don't exist"""
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        conn = self._conn()
+        with conn:
+            for name in COLLECTIONS:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    "vehicle_id TEXT, severity TEXT, timestamp TEXT, data TEXT NOT NULL)"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_vehicle ON {name} (vehicle_id, timestamp)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_timestamp ON {name} (timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts (severity, timestamp)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if self._get_meta('version') is None:
+            self.reset()
+
+    def _get_meta(self, key, conn=None):
+        row = (conn or self._conn()).execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _has_aggregates(self):
+        return self._get_meta('aggregates') is not None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _check_collection(self, collection):
+        if collection not in COLLECTIONS:
+            raise ValueError(f"Unknown collection: {collection}")
+
+    def _insert(self, conn, collection, items):
+        self._check_collection(collection)
+        conn.executemany(
+            f"INSERT INTO {collection} (vehicle_id, severity, timestamp, data) VALUES (?, ?, ?, ?)",
+            [(i.get('vehicle_id'), i.get('severity'), _timestamp_of(i), json.dumps(i)) for i in items]
+        )
+
+    def read(self):
+        """Read entire database as a document"""
+        conn = self._conn()
+        db = {}
+        for (key, value) in conn.execute("SELECT key, value FROM meta"):
+            db[key] = json.loads(value)
+        for name in COLLECTIONS:
+            db[name] = [json.loads(row[0]) for row in conn.execute(f"SELECT data FROM {name} ORDER BY id")]
+        return db
+
+    def write(self, data):
+        """Replace entire database"""
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM meta")
+                for name in COLLECTIONS:
+                    conn.execute(f"DELETE FROM {name}")
+                    self._insert(conn, name, data.get(name, []))
+                for key, value in data.items():
+                    if key not in COLLECTIONS:
+                        self._set_meta(conn, key, value)
+            self.version += 1
+            return True
+        except Exception as e:
+            print(f"Error writing database: {e}")
+            return False
+
+    def _persist(self, ops):
+        """Apply mutation records in a single transaction"""
+        with self._lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                meta = None
+                for op in ops:
+                    if op["op"] not in ("append", "evict"):
+                        raise ValueError(f"Unknown database op: {op['op']}")
+                    if meta is None:
+                        meta = {
+                            "analytics": self._get_meta('analytics', conn) or {},
+                            "aggregates": self._get_meta('aggregates', conn) or {}
+                        }
+                    if op["op"] == "evict":
+                        collection = op["collection"]
+                        self._check_collection(collection)
+                        keys = set(op["keys"]) if op.get("keys") is not None else None
+                        rows = conn.execute(f"SELECT id, data FROM {collection} WHERE timestamp < ?", (op["before"],))
+                        evicted = [(row_id, json.loads(data)) for row_id, data in rows.fetchall()]
+                        if keys is not None:
+                            evicted = [(row_id, item) for row_id, item in evicted if record_key(collection, item) in keys]
+                        conn.executemany(f"DELETE FROM {collection} WHERE id = ?", [(row_id,) for row_id, _ in evicted])
+                        savings = savings_of(collection, [item for _, item in evicted])
+                        if savings:
+                            analytics = meta["analytics"]
+                            analytics["evicted_savings"] = analytics.get("evicted_savings", 0) + savings
+                        continue
+                    self._insert(conn, op["collection"], op["items"])
+                    if op.get("counter"):
+                        analytics = meta["analytics"]
+                        analytics[op["counter"]] = analytics.get(op["counter"], 0) + len(op["items"])
+                    update_aggregates(meta, op["collection"], op["items"])
+                if meta is not None:
+                    self._set_meta(conn, 'analytics', meta["analytics"])
+                    self._set_meta(conn, 'aggregates', meta["aggregates"])
+            self.version += 1
+            return True
+
+    def get_analytics(self):
+        """Global counters plus the materialized aggregates"""
+        return {
+            "analytics": self._get_meta('analytics') or {},
+            "aggregates": self._get_meta('aggregates') or {}
+        }
+
+    def get_expired(self, collection, before):
+        """Get records of a collection older than `before`"""
+        self._check_collection(collection)
+        rows = self._conn().execute(
+            f"SELECT data FROM {collection} WHERE timestamp < ? ORDER BY timestamp", (before.isoformat(),)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def query(self, collection, limit=50, cursor=None, since=None, until=None,
+              vehicle_id=None, severity=None):
+        """Page through a collection newest first (keyset on timestamp, id)"""
+        self._check_collection(collection)
+        since = parse_bound(since, "since")
+        until = parse_bound(until, "until")
+        clauses, params = [], []
+        if vehicle_id:
+            clauses.append("vehicle_id = ?")
+            params.append(vehicle_id)
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat())
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until.isoformat())
+        if cursor:
+            ts, row_id = decode_cursor(cursor, tiebreaker=int)
+            clauses.append("(IFNULL(timestamp, '') < ? OR (IFNULL(timestamp, '') = ? AND id < ?))")
+            params.extend([ts, ts, row_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT IFNULL(timestamp, ''), id, data FROM {collection} {where} "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1][:2]) if len(rows) > limit else None
+        return {"items": [json.loads(row[2]) for row in rows[:limit]], "next_cursor": next_cursor}
+
+    def get_vehicle(self, vehicle_id):
+        """Get specific vehicle"""
+        row = self._conn().execute(
+            "SELECT data FROM vehicles WHERE vehicle_id = ? ORDER BY id LIMIT 1", (vehicle_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_all_vehicles(self):
+        """Get all vehicles"""
+        return [json.loads(row[0]) for row in self._conn().execute("SELECT data FROM vehicles ORDER BY id")]
+
+    def get_alerts(self, severity=None):
+        """Get alerts"""
+        if severity:
+            rows = self._conn().execute("SELECT data FROM alerts WHERE severity = ? ORDER BY id", (severity,))
+        else:
+            rows = self._conn().execute("SELECT data FROM alerts ORDER BY id")
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        """Flush pending writes and close this thread's connection"""
+        super().close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,97 @@
+import json
+import threading
+from collections import deque
+
+# Fields that count as a change; a new timestamp alone does not
+IGNORED_FIELDS = ("timestamp",)
+
+
+def format_event(data, event_id=None, event=None):
+    """Serialize one Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+class TelemetryBroadcaster:
+    """Fans telemetry out to Server-Sent Events subscribers.
+
+    `publish()` keeps only readings whose values changed since the vehicle's
+    previous reading and stores them as one numbered event. The last
+    `history` events are retained so a client reconnecting with
+    Last-Event-ID receives exactly what it missed; a client that fell
+    further behind gets a full snapshot instead.
+    """
+
+    def __init__(self, history=1000):
+        self.latest = {}
+        self.last_id = 0
+        self._events = deque(maxlen=history)
+        self._cond = threading.Condition()
+
+    def _changed(self, reading):
+        previous = self.latest.get(reading["vehicle_id"])
+        if previous is None:
+            return True
+        for key, value in reading.items():
+            if key not in IGNORED_FIELDS and previous.get(key) != value:
+                return True
+        return False
+
+    def publish(self, readings):
+        """Record a batch of readings; returns the new event id or None if nothing changed"""
+        with self._cond:
+            changed = [r for r in readings if self._changed(r)]
+            for reading in readings:
+                self.latest[reading["vehicle_id"]] = reading
+            if not changed:
+                return None
+            self.last_id += 1
+            self._events.append((self.last_id, json.dumps(changed, separators=(",", ":"))))
+            self._cond.notify_all()
+            return self.last_id
+
+    def snapshot(self):
+        """(event id, JSON of every vehicle's latest reading)"""
+        with self._cond:
+            return self.last_id, json.dumps(list(self.latest.values()), separators=(",", ":"))
+
+    def events_after(self, last_id, timeout=None):
+        """Events newer than `last_id`, waiting up to `timeout` seconds for one.
+
+        Returns None when `last_id` is outside the retained history, e.g. too
+        old or from before a server restart (the caller should resend a snapshot).
+        """
+        with self._cond:
+            if last_id > self.last_id:
+                return None
+            if self.last_id == last_id:
+                self._cond.wait_for(lambda: self.last_id > last_id, timeout)
+            if not self._events or self.last_id <= last_id:
+                return []
+            if last_id < self._events[0][0] - 1:
+                return None
+            return [event for event in self._events if event[0] > last_id]
+
+    def stream(self, last_event_id=None, heartbeat=15.0):
+        """Generator of SSE text for one subscriber"""
+        if last_event_id is None:
+            last_id, data = self.snapshot()
+            yield format_event(data, last_id, "snapshot")
+        else:
+            last_id = last_event_id
+        while True:
+            events = self.events_after(last_id, heartbeat)
+            if events is None:
+                last_id, data = self.snapshot()
+                yield format_event(data, last_id, "snapshot")
+            elif not events:
+                yield ": keep-alive\n\n"
+            else:
+                for event_id, data in events:
+                    yield format_event(data, event_id, "telemetry")
+                last_id = events[-1][0]
@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from telemetry_log import TelemetryLogReader
+from timeseries_store import to_epoch
+
+NUMBER = (int, float)
+
+
+def iso_timestamp(value):
+    """Whether a string parses as an ISO-8601 timestamp (what the storage layers convert with fromisoformat)"""
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    return True
+
+
+def numbers(value):
+    return all(isinstance(v, NUMBER) and not isinstance(v, bool) for v in value)
+
+
+# field: (types, minimum, maximum, required, check); check(value) -> bool validates the content
+TELEMETRY_SCHEMA = {
+    "vehicle_id": (str, None, None, True, None),
+    "timestamp": (str, None, None, False, iso_timestamp),
+    "engine_temp_celsius": (NUMBER, -50, 200, True, None),
+    "oil_pressure_bar": (NUMBER, 0, 20, True, None),
+    "rpm": (NUMBER, 0, 10000, False, None),
+    "fuel_consumption_kmpl": (NUMBER, 0, 100, False, None),
+    "battery_voltage": (NUMBER, 0, 30, False, None),
+    "sensor_health": (NUMBER, 0, 100, True, None),
+    "degradation_factor": (NUMBER, 0, 10, False, None),
+    "tire_pressure_psi": (list, None, None, False, numbers),
+    "location": (str, None, None, False, None),
+    "alert_status": (str, None, None, False, None)
+}
+
+
+def compile_schema(schema):
+    """Turn a schema dict into a fast validate(record) -> error message or None.
+
+    Field specs are flattened into tuples once, so validating a reading is a
+    single pass with no dict lookups into the schema.
+    """
+    required = tuple(name for name, spec in schema.items() if spec[3])
+    checks = tuple(
+        (name, types, lo, hi, lo is not None or hi is not None, check)
+        for name, (types, lo, hi, _, check) in schema.items()
+    )
+
+    def validate(record):
+        if type(record) is not dict:
+            return "reading must be an object"
+        for name in required:
+            if name not in record:
+                return f"missing field '{name}'"
+        for name, types, lo, hi, ranged, check in checks:
+            value = record.get(name)
+            if value is None:
+                continue
+            if not isinstance(value, types) or isinstance(value, bool):
+                return f"field '{name}' has wrong type"
+            if ranged and not (lo <= value <= hi):
+                return f"field '{name}' out of range [{lo}, {hi}]"
+            if check is not None and not check(value):
+                return f"field '{name}' is malformed"
+        return None
+
+    return validate
+
+
+validate_reading = compile_schema(TELEMETRY_SCHEMA)
+
+
+class TelemetryIngestBuffer:
+    """Bounded in-memory staging queue between the API and storage.
+
+    `offer()` is all-or-nothing: a batch that does not fit is refused (the API
+    answers 429) instead of growing memory. A flusher thread drains up to
+    `flush_batch` readings at a time, at least every `flush_interval` seconds,
+    and hands each batch to every sink. The latest reading per vehicle is
+    kept in memory for the stream endpoint.
+
+    History only moves forward, so `late()` finds readings older than their
+    vehicle's newest one for the API to refuse up front. `watermark(vehicle_id)`
+    gives the newest stored epoch of vehicles this buffer has not seen yet.
+    """
+
+    def __init__(self, sinks=None, capacity=50000, flush_batch=5000, flush_interval=1.0, watermark=None):
+        self.sinks = list(sinks or [])
+        self.watermark = watermark
+        self.newest = {}
+        self.capacity = capacity
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self.latest = {}
+        self.update_count = 0
+        self.last_update = None
+        self.accepted = 0
+        self.rejected_full = 0
+        self.rejected_late = 0
+        self.flushed = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._queue)
+
+    def offer(self, readings):
+        """Stage validated readings; False when the queue has no room for the batch"""
+        now = datetime.now().isoformat()
+        with self._cond:
+            if len(self._queue) + len(readings) > self.capacity:
+                self.rejected_full += len(readings)
+                return False
+            for reading in readings:
+                if reading.get("timestamp") is None:
+                    reading["timestamp"] = now
+            self._track(readings, now)
+            self._queue.extend(readings)
+            self.accepted += len(readings)
+            if len(self._queue) >= self.flush_batch:
+                self._cond.notify()
+        return True
+
+    def late(self, readings):
+        """Indices of validated readings older than their vehicle's newest accepted or stored reading"""
+        late, newest = [], {}
+        with self._cond:
+            for index, reading in enumerate(readings):
+                vehicle_id, ts = reading["vehicle_id"], reading.get("timestamp")
+                if ts is None:
+                    continue  # stamped with the ingest time
+                if vehicle_id not in newest:
+                    newest[vehicle_id] = self.newest.get(vehicle_id)
+                    if newest[vehicle_id] is None and self.watermark is not None:
+                        newest[vehicle_id] = self.watermark(vehicle_id)
+                ts = to_epoch(ts)
+                if newest[vehicle_id] is not None and ts < newest[vehicle_id]:
+                    late.append(index)
+                else:
+                    newest[vehicle_id] = ts
+            self.rejected_late += len(late)
+        return late
+
+    def _track(self, readings, timestamp):
+        for reading in readings:
+            self.latest[reading["vehicle_id"]] = reading
+            try:
+                ts = to_epoch(reading.get("timestamp") or timestamp)
+            except (TypeError, ValueError):
+                continue
+            if ts > self.newest.get(reading["vehicle_id"], float("-inf")):
+                self.newest[reading["vehicle_id"]] = ts
+        self.update_count += 1
+        self.last_update = timestamp
+
+    def observe(self, readings, timestamp=None):
+        """Update the latest readings without queuing them (already stored elsewhere)"""
+        with self._cond:
+            self._track(readings, timestamp or datetime.now().isoformat())
+
+    def snapshot(self):
+        """Latest reading of every vehicle, shaped like a simulator frame"""
+        with self._cond:
+            vehicles = list(self.latest.values())
+            return {
+                "timestamp": self.last_update,
+                "vehicles": vehicles,
+                "update_count": self.update_count
+            }
+
+    def flush(self):
+        """Drain one batch to the sinks; returns the number of readings written"""
+        with self._cond:
+            count = min(len(self._queue), self.flush_batch)
+            batch = [self._queue.popleft() for _ in range(count)]
+        if batch:
+            for sink in self.sinks:
+                try:
+                    sink(batch)
+                except Exception as e:
+                    print(f"  ❌ Telemetry sink error: {e}")
+            self.flushed += len(batch)
+        return len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.flush_batch:
+                    self._cond.wait(self.flush_interval)
+            while self.flush() == self.flush_batch:
+                pass
+
+    def start(self):
+        """Start the background flusher thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="telemetry-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stats(self):
+        return {
+            "queued": len(self._queue),
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "rejected_full": self.rejected_full,
+            "rejected_late": self.rejected_late,
+            "flushed": self.flushed
+        }
+
+
+def log_sink(log):
+    """Sink appending each flushed batch to a TelemetryLog as one frame"""
+    def write(batch):
+        log.append({
+            "timestamp": datetime.now().isoformat(),
+            "vehicles": batch,
+            "source": "ingest"
+        })
+    return write
+
+
+def follow_log(directory, sinks, poll_interval=1.0):
+    """Feed frames appended to a TelemetryLog (e.g. by RealtimeSimulator) to sinks.
+
+    Each sink is called with the frame's list of readings. Runs in a daemon
+    thread and starts from the end of the log.
+    """
+    def run():
+        reader = TelemetryLogReader(directory)
+        while True:
+            try:
+                for frame in reader.follow(poll_interval):
+                    for sink in sinks:
+                        sink(frame.get("vehicles", []))
+            except Exception as e:
+                print(f"  ❌ Telemetry follower error: {e}")
+                time.sleep(poll_interval)
+
+    thread = threading.Thread(target=run, name="telemetry-follower", daemon=True)
+    thread.start()
+    return thread
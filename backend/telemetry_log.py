@@ -0,0 +1,192 @@
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+# One index entry per frame: frame timestamp (epoch seconds) and byte offset in the segment
+INDEX_DTYPE = np.dtype([("ts", "<f8"), ("offset", "<i8")])
+
+
+def _frame_time(frame):
+    ts = frame.get("timestamp")
+    if isinstance(ts, str):
+        return datetime.fromisoformat(ts).timestamp()
+    return float(ts) if ts is not None else time.time()
+
+
+def _segment_name(number):
+    return f"segment-{number:08d}"
+
+
+def list_segments(directory):
+    """Segment numbers present in a log directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        int(name[len("segment-"):-len(".jsonl")])
+        for name in os.listdir(directory)
+        if name.startswith("segment-") and name.endswith(".jsonl")
+    )
+
+
+class TelemetryLog:
+    """Append-only, segment-rotated JSONL log of telemetry frames.
+
+    Each frame is one line in `segment-NNNNNNNN.jsonl`; a sibling `.idx` file
+    records (timestamp, byte offset) per frame so readers can seek without
+    parsing. A segment is sealed (data and index fsynced) before the next one
+    is created, and a torn trailing line is cut off when the log is reopened.
+    """
+
+    def __init__(self, directory="data/telemetry", segment_max_bytes=64 * 1024 * 1024, fsync=False):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        segments = list_segments(directory)
+        self.segment = segments[-1] if segments else 0
+        self._open(recover=bool(segments))
+
+    def _paths(self, number):
+        base = os.path.join(self.directory, _segment_name(number))
+        return base + ".jsonl", base + ".idx"
+
+    def _open(self, recover=False):
+        data_path, index_path = self._paths(self.segment)
+        if recover:
+            self._recover(data_path, index_path)
+        self._data = open(data_path, 'ab')
+        self._index = open(index_path, 'ab')
+        self._size = self._data.tell()
+
+    def _recover(self, data_path, index_path):
+        """Drop a partial trailing line and any index entries pointing past it"""
+        with open(data_path, 'rb+') as f:
+            content = f.read()
+            end = content.rfind(b"\n") + 1
+            if end != len(content):
+                f.truncate(end)
+        if os.path.exists(index_path):
+            usable = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+            entries = np.fromfile(index_path, dtype=INDEX_DTYPE, count=usable)
+            valid = entries[entries["offset"] < end]
+            if len(valid) != len(entries) or os.path.getsize(index_path) % INDEX_DTYPE.itemsize:
+                valid.tofile(index_path)
+
+    def _roll(self):
+        """Seal the active segment and start the next one"""
+        self._sync()
+        self._data.close()
+        self._index.close()
+        self.segment += 1
+        self._open()
+
+    def _sync(self):
+        self._data.flush()
+        self._index.flush()
+        os.fsync(self._data.fileno())
+        os.fsync(self._index.fileno())
+
+    def append(self, frame):
+        """Append one frame; returns (segment, offset)"""
+        line = (json.dumps(frame, separators=(",", ":")) + "\n").encode()
+        if self._size and self._size + len(line) > self.segment_max_bytes:
+            self._roll()
+        offset = self._size
+        self._data.write(line)
+        self._data.flush()
+        self._index.write(np.array([(_frame_time(frame), offset)], dtype=INDEX_DTYPE).tobytes())
+        self._index.flush()
+        if self.fsync:
+            self._sync()
+        self._size += len(line)
+        return self.segment, offset
+
+    def close(self):
+        self._sync()
+        self._data.close()
+        self._index.close()
+
+
+class TelemetryLogReader:
+    """Tails a TelemetryLog from another thread or process.
+
+    Keeps a (segment, offset) position and only parses bytes appended since
+    the last call.
+    """
+
+    def __init__(self, directory="data/telemetry", from_start=False):
+        self.directory = directory
+        segments = list_segments(directory)
+        if from_start or not segments:
+            self.segment = segments[0] if segments else 0
+            self.offset = 0
+        else:
+            self.segment = segments[-1]
+            self.offset = os.path.getsize(self._paths(self.segment)[0])
+
+    def _paths(self, number):
+        base = os.path.join(self.directory, _segment_name(number))
+        return base + ".jsonl", base + ".idx"
+
+    def _index(self, number):
+        index_path = self._paths(number)[1]
+        if not os.path.exists(index_path):
+            return np.empty(0, dtype=INDEX_DTYPE)
+        return np.fromfile(index_path, dtype=INDEX_DTYPE, count=os.path.getsize(index_path) // INDEX_DTYPE.itemsize)
+
+    def seek(self, timestamp):
+        """Position the reader at the first frame at or after `timestamp`"""
+        ts = timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+        for number in list_segments(self.directory):
+            index = self._index(number)
+            if len(index) and index["ts"][-1] >= ts:
+                pos = int(np.searchsorted(index["ts"], ts, side="left"))
+                self.segment, self.offset = number, int(index["offset"][pos])
+                return self
+        segments = list_segments(self.directory)
+        self.segment = segments[-1] if segments else 0
+        data_path = self._paths(self.segment)[0]
+        self.offset = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        return self
+
+    def read_new(self, max_frames=None):
+        """Parse complete frames appended since the last call"""
+        frames = []
+        while True:
+            data_path = self._paths(self.segment)[0]
+            if os.path.exists(data_path):
+                with open(data_path, 'rb') as f:
+                    f.seek(self.offset)
+                    chunk = f.read()
+                end = chunk.rfind(b"\n") + 1
+                for line in chunk[:end - 1].split(b"\n") if end else []:
+                    frames.append(json.loads(line))
+                    self.offset += len(line) + 1
+                    if max_frames and len(frames) >= max_frames:
+                        return frames
+            later = [n for n in list_segments(self.directory) if n > self.segment]
+            if not later or (os.path.exists(data_path) and self.offset < os.path.getsize(data_path)):
+                return frames
+            self.segment, self.offset = later[0], 0
+
+    def latest(self):
+        """Most recent frame, located through the index (the writer indexes a frame after writing it)"""
+        for number in reversed(list_segments(self.directory)):
+            index = self._index(number)
+            if len(index):
+                with open(self._paths(number)[0], 'rb') as f:
+                    f.seek(int(index["offset"][-1]))
+                    return json.loads(f.readline())
+        return None
+
+    def follow(self, poll_interval=0.5):
+        """Yield frames forever as they are appended"""
+        while True:
+            frames = self.read_new()
+            for frame in frames:
+                yield frame
+            if not frames:
+                time.sleep(poll_interval)
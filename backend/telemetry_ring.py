@@ -0,0 +1,139 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from fleet_telemetry import COLUMNS
+
+MAGIC = 0x31474E4952445247  # "GRDRING1" little-endian
+HEADER_BYTES = 64
+
+# Header slots (uint64): magic, capacity, n_vehicles, n_columns, seq, write_seq
+H_MAGIC, H_CAPACITY, H_VEHICLES, H_COLUMNS, H_SEQ, H_WRITE_SEQ = range(6)
+
+# Attempts latest() makes before giving up on a writer that keeps overtaking it
+READ_RETRIES = 1000
+
+RING_COLUMNS = COLUMNS + (
+    "tire_pressure_fl",
+    "tire_pressure_fr",
+    "tire_pressure_rl",
+    "tire_pressure_rr",
+    "alert_code"
+)
+
+
+def default_ring_path():
+    """Prefer tmpfs so the mapping never touches disk"""
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/guardian_telemetry.ring"
+    return os.path.join("data", "telemetry.ring")
+
+
+class TelemetryRing:
+    """Fixed-schema, memory-mapped ring buffer of fleet telemetry ticks.
+
+    Layout: a 64-byte header, a float64 timestamp per slot, then one float32
+    block per column shaped (2 * capacity, n_vehicles). Every tick is written
+    to slot `seq % capacity` and mirrored at `+ capacity`, so the latest N
+    ticks are always one contiguous slice and readers get zero-copy views.
+
+    Views stay valid until the writer laps them (capacity - N more ticks);
+    readers that keep data longer should copy it or check `seq` afterwards.
+    Vehicle ids are kept in a `<path>.vehicles.json` sidecar.
+    """
+
+    def __init__(self, path, mm):
+        self.path = path
+        self._mm = mm
+        self.header = mm[:HEADER_BYTES].view(np.uint64)
+        self.capacity = int(self.header[H_CAPACITY])
+        self.n_vehicles = int(self.header[H_VEHICLES])
+        n_columns = int(self.header[H_COLUMNS])
+        ts_bytes = 8 * 2 * self.capacity
+        self.timestamps = mm[HEADER_BYTES:HEADER_BYTES + ts_bytes].view(np.float64)
+        self.data = mm[HEADER_BYTES + ts_bytes:].view(np.float32).reshape(
+            n_columns, 2 * self.capacity, self.n_vehicles
+        )
+        with open(path + ".vehicles.json") as f:
+            self.vehicle_ids = json.load(f)
+
+    @classmethod
+    def create(cls, path, vehicle_ids, capacity=60):
+        """Create (or replace) a ring for a fleet; used by the writer"""
+        vehicle_ids = [str(v) for v in vehicle_ids]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".vehicles.json", "w") as f:
+            json.dump(vehicle_ids, f)
+        size = HEADER_BYTES + 8 * 2 * capacity + 4 * len(RING_COLUMNS) * 2 * capacity * len(vehicle_ids)
+        mm = np.memmap(path, dtype=np.uint8, mode="w+", shape=(size,))
+        header = mm[:HEADER_BYTES].view(np.uint64)
+        header[H_CAPACITY] = capacity
+        header[H_VEHICLES] = len(vehicle_ids)
+        header[H_COLUMNS] = len(RING_COLUMNS)
+        header[H_MAGIC] = MAGIC
+        return cls(path, mm)
+
+    @classmethod
+    def open(cls, path=None):
+        """Map an existing ring read-only; used by readers in any process"""
+        path = path or default_ring_path()
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if int(mm[:HEADER_BYTES].view(np.uint64)[H_MAGIC]) != MAGIC:
+            raise ValueError(f"{path} is not a telemetry ring")
+        return cls(path, mm)
+
+    @property
+    def seq(self):
+        """Number of ticks written so far"""
+        return int(self.header[H_SEQ])
+
+    def write_frame(self, frame):
+        """Write one FleetFrame into the next slot (single writer)"""
+        seq = self.seq
+        slot = seq % self.capacity
+        rows = (slot, slot + self.capacity)
+        self.header[H_WRITE_SEQ] = 2 * seq + 1  # odd while a tick is in flight
+        for row in rows:
+            for c, name in enumerate(COLUMNS):
+                self.data[c, row] = frame.columns[name]
+            base = len(COLUMNS)
+            self.data[base:base + 4, row] = frame.tire_pressure.T
+            self.data[base + 4, row] = frame.alert_codes
+            self.timestamps[row] = frame.timestamp.timestamp()
+        self.header[H_SEQ] = seq + 1
+        self.header[H_WRITE_SEQ] = 2 * (seq + 1)
+        return seq + 1
+
+    def latest(self, n=1, copy=False):
+        """The latest `n` ticks, as zero-copy views or (copy=True) private arrays.
+
+        Returns {"seq", "timestamps": (n,), <column>: (n, n_vehicles)}; rows
+        are oldest first. Fewer rows come back while the ring is filling.
+
+        The read is checked against `write_seq` like a seqlock: if the writer
+        started a tick meanwhile it is retried, so a copy is never torn.
+        Views are capped at capacity - 1 ticks, which keeps them clear of the
+        slot the next write goes to.
+        """
+        for _ in range(READ_RETRIES):
+            before = int(self.header[H_WRITE_SEQ])
+            if before % 2 == 1:
+                time.sleep(0)  # a tick is in flight
+                continue
+            seq = before // 2
+            count = min(n, seq, self.capacity if copy else self.capacity - 1)
+            end = (seq - 1) % self.capacity + 1 + self.capacity if seq else self.capacity
+            start = end - count
+            result = {"seq": seq, "timestamps": self.timestamps[start:end]}
+            for c, name in enumerate(RING_COLUMNS):
+                result[name] = self.data[c, start:end]
+            if copy:
+                result = {name: np.array(value) if name != "seq" else value for name, value in result.items()}
+            if int(self.header[H_WRITE_SEQ]) == before:
+                return result
+        raise RuntimeError(f"{self.path}: writer kept overwriting the requested ticks")
+
+    def flush(self):
+        self._mm.flush()
@@ -0,0 +1,443 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from fleet_telemetry import COLUMNS
+
+# Row 0 of every chunk is the timestamp (epoch seconds); the rest follow COLUMNS
+SERIES_COLUMNS = ("timestamp",) + COLUMNS
+
+# Rollup tiers in seconds; each must divide the next
+ROLLUP_TIERS = (60, 3600, 86400)
+ROLLUP_STATS = ("min", "max", "mean", "count")
+
+# Rollup rows: bucket start, then one block of COLUMNS per statistic
+ROLLUP_COLUMNS = ("timestamp",) + tuple(f"{name}_{stat}" for stat in ROLLUP_STATS for name in COLUMNS)
+
+
+def to_epoch(value):
+    """Epoch seconds from a datetime, ISO string or number (None passes through)"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def summarize_readings(bucket, block):
+    """Rollup row for raw rows (SERIES_COLUMNS, n); NaN readings are ignored"""
+    values = block[1:]
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, values, 0).sum(axis=1) / count
+    return np.concatenate((
+        [bucket], np.fmin.reduce(values, axis=1), np.fmax.reduce(values, axis=1), mean, count
+    ))
+
+
+def summarize_rollups(bucket, block):
+    """Rollup row merging finer rollup rows (ROLLUP_COLUMNS, n)"""
+    k = len(COLUMNS)
+    mins, maxs, means, counts = (block[1 + i * k:1 + (i + 1) * k] for i in range(4))
+    count = counts.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(counts > 0, means * counts, 0).sum(axis=1) / count
+    return np.concatenate((
+        [bucket], np.fmin.reduce(mins, axis=1), np.fmax.reduce(maxs, axis=1), mean, count
+    ))
+
+
+class VehicleSeries:
+    """Append-only column chunks for one vehicle.
+
+    Sealed chunks are `chunk-NNNNNN.npy` arrays shaped (rows, chunk_size)
+    and are memory-mapped on read; the open chunk lives in memory and is
+    saved to `head.npy` on flush. Timestamps only move forward, so both the
+    chunk list and each chunk's timestamp row are sorted.
+
+    Sealing writes the chunk atomically and then deletes `head.npy`; a
+    `head.npy` left behind by a crash in between is a prefix of the last
+    chunk and is discarded on load.
+    """
+
+    def __init__(self, directory, chunk_size, rows=len(SERIES_COLUMNS)):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.rows = rows
+        self.chunks = []
+        self.chunk_first = []
+        self.chunk_last = []
+        self.head = np.empty((rows, min(16, chunk_size)))
+        self.fill = 0
+        self.dirty = False
+        if os.path.isdir(directory):
+            self._load()
+
+    def _chunk_path(self, number):
+        return os.path.join(self.directory, f"chunk-{number:06d}.npy")
+
+    def _load(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("chunk-") and n.endswith(".npy"))
+        for name in names:
+            path = os.path.join(self.directory, name)
+            timestamps = np.load(path, mmap_mode='r')[0]
+            self.chunks.append(path)
+            self.chunk_first.append(float(timestamps[0]))
+            self.chunk_last.append(float(timestamps[-1]))
+        head_path = os.path.join(self.directory, "head.npy")
+        if os.path.exists(head_path):
+            head = np.load(head_path)
+            if self.chunks and np.array_equal(
+                head, np.load(self.chunks[-1], mmap_mode='r')[:, :head.shape[1]], equal_nan=True
+            ):
+                os.remove(head_path)  # already sealed; the crash came before its removal
+                return
+            self.fill = head.shape[1]
+            self.head = np.empty((self.rows, max(self.fill, self.head.shape[1])))
+            self.head[:, :self.fill] = head
+
+    @property
+    def last_timestamp(self):
+        if self.fill:
+            return self.head[0, self.fill - 1]
+        return self.chunk_last[-1] if self.chunks else -np.inf
+
+    def __len__(self):
+        return len(self.chunks) * self.chunk_size + self.fill
+
+    def append(self, row):
+        """Append one row; False if it is older than the last one"""
+        if row[0] < self.last_timestamp:
+            return False
+        if self.fill == self.head.shape[1]:
+            grown = np.empty((self.rows, min(2 * self.fill, self.chunk_size)))
+            grown[:, :self.fill] = self.head[:, :self.fill]
+            self.head = grown
+        self.head[:, self.fill] = row
+        self.fill += 1
+        self.dirty = True
+        if self.fill == self.chunk_size:
+            self._seal()
+        return True
+
+    def _seal(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._chunk_path(len(self.chunks))
+        tmp = os.path.join(self.directory, "chunk.tmp.npy")
+        np.save(tmp, self.head)
+        os.replace(tmp, path)
+        head_path = os.path.join(self.directory, "head.npy")
+        if os.path.exists(head_path):
+            os.remove(head_path)  # its rows now live in the sealed chunk
+        self.chunks.append(path)
+        self.chunk_first.append(float(self.head[0, 0]))
+        self.chunk_last.append(float(self.head[0, -1]))
+        self.head = np.empty((self.rows, min(16, self.chunk_size)))
+        self.fill = 0
+
+    def flush(self):
+        """Persist the open chunk atomically"""
+        if not self.dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        head_path = os.path.join(self.directory, "head.npy")
+        tmp = os.path.join(self.directory, "head.tmp.npy")
+        np.save(tmp, self.head[:, :self.fill])
+        os.replace(tmp, head_path)
+        self.dirty = False
+
+    def _blocks(self, start, end):
+        """Loaders for the chunks (and head) that can hold timestamps in [start, end]"""
+        first = int(np.searchsorted(self.chunk_last, start, side='left'))
+        last = int(np.searchsorted(self.chunk_first, end, side='right'))
+        blocks = [
+            (lambda path=path: np.load(path, mmap_mode='r'), lo, hi)
+            for path, lo, hi in zip(self.chunks[first:last], self.chunk_first[first:last], self.chunk_last[first:last])
+        ]
+        if self.fill:
+            blocks.append((lambda: self.head[:, :self.fill], self.head[0, 0], self.head[0, self.fill - 1]))
+        return blocks
+
+    def range(self, start=None, end=None, limit=None):
+        """Rows with start <= timestamp <= end as one (rows, n) array.
+
+        With `limit`, only the newest `limit` rows are returned and older
+        chunks are never opened.
+        """
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        parts, count = [], 0
+        for load, _, _ in reversed(self._blocks(start, end)):
+            block = load()
+            lo = np.searchsorted(block[0], start, side='left')
+            hi = np.searchsorted(block[0], end, side='right')
+            if limit:
+                lo = max(lo, hi - (limit - count))
+            if hi > lo:
+                parts.append(np.array(block[:, lo:hi]))
+                count += hi - lo
+            if limit and count >= limit:
+                break
+        if not parts:
+            return np.empty((self.rows, 0))
+        return np.concatenate(parts[::-1], axis=1)
+
+    def count(self, start=None, end=None):
+        """Number of rows in [start, end]; only partially covered chunks are searched"""
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        total = 0
+        for load, first, last in self._blocks(start, end):
+            if start <= first and last <= end:
+                total += load().shape[1]
+            else:
+                timestamps = load()[0]
+                total += int(np.searchsorted(timestamps, end, side='right') - np.searchsorted(timestamps, start, side='left'))
+        return total
+
+
+class TimeSeriesStore:
+    """Per-vehicle columnar telemetry history on disk.
+
+    Each vehicle has its own directory of chunks, so a range query only
+    touches that vehicle's files and binary-searches their timestamp rows.
+    Series are opened lazily on first use. Open chunks are persisted at most
+    every `flush_interval` seconds by `sink()` (sealed chunks immediately).
+
+    Rollups (min/max/mean/count per column) are kept per vehicle for every
+    tier in `tiers`, under `rollup-<seconds>/`. A bucket is closed when a
+    reading lands in the next one: the finest tier is computed from raw rows,
+    each coarser tier from the tier below it. The still-open bucket of each
+    tier is summarized on demand, so queries always include the latest data.
+
+    At most `max_open` raw series (and as many rollup series) are kept in
+    memory; the least recently used one is flushed and closed to make room,
+    and reopens from disk on its next use. This bounds memory for large
+    fleets to about max_open open chunks.
+
+    A reading older than its vehicle's newest one is not stored; it is
+    counted in `out_of_order` (see stats()). The ingest API refuses such
+    readings up front, so only racing writers should ever reach that count.
+    """
+
+    def __init__(self, directory="data/timeseries", chunk_size=4096, flush_interval=10.0, tiers=ROLLUP_TIERS,
+                 max_open=1024):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.tiers = tuple(tiers)
+        self.max_open = max_open
+        self._last_flush = time.monotonic()
+        self.out_of_order = 0
+        self.rejected = 0
+        self.closed = 0
+        self._series = OrderedDict()
+        self._rollups = OrderedDict()
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _vehicle_dir(self, vehicle_id, tier=None):
+        base = self.directory if tier is None else os.path.join(self.directory, f"rollup-{tier}")
+        return os.path.join(base, "v_" + quote(str(vehicle_id), safe=''))
+
+    def _open(self, cache, key, create):
+        """Series from `cache` (marked most recently used), closing the least recently used beyond max_open"""
+        series = cache.get(key)
+        if series is not None:
+            cache.move_to_end(key)
+            return series
+        series = create()
+        if series is not None:
+            cache[key] = series
+            while len(cache) > self.max_open:
+                _, oldest = cache.popitem(last=False)
+                oldest.flush()
+                self.closed += 1
+        return series
+
+    def series(self, vehicle_id, create=True):
+        def load():
+            if not create and not os.path.isdir(self._vehicle_dir(vehicle_id)):
+                return None
+            return VehicleSeries(self._vehicle_dir(vehicle_id), self.chunk_size)
+
+        with self._lock:
+            return self._open(self._series, vehicle_id, load)
+
+    def rollup(self, tier, vehicle_id):
+        with self._lock:
+            return self._open(
+                self._rollups, (tier, vehicle_id),
+                lambda: VehicleSeries(self._vehicle_dir(vehicle_id, tier), self.chunk_size, len(ROLLUP_COLUMNS))
+            )
+
+    def vehicles(self):
+        """Vehicle ids with stored history"""
+        with self._lock:
+            on_disk = {unquote(name[2:]) for name in os.listdir(self.directory) if name.startswith("v_")}
+            return sorted(on_disk | set(self._series))
+
+    def last_timestamp(self, vehicle_id):
+        """Epoch of a vehicle's newest stored reading (None without history)"""
+        with self._lock:
+            series = self.series(vehicle_id, create=False)
+            last = series.last_timestamp if series is not None else -np.inf
+            return None if last == -np.inf else float(last)
+
+    def stats(self):
+        """Open series and counts of readings the store did not keep"""
+        with self._lock:
+            return {
+                "open_series": len(self._series),
+                "closed": self.closed,
+                "rejected": self.rejected,
+                "out_of_order": self.out_of_order
+            }
+
+    def _append_row(self, vehicle_id, row):
+        series = self.series(vehicle_id)
+        previous = series.last_timestamp
+        if not series.append(row):
+            self.out_of_order += 1
+            return
+        if previous == -np.inf:
+            return
+        for level, tier in enumerate(self.tiers):
+            bucket = previous // tier * tier
+            if row[0] < bucket + tier:
+                break  # a coarser bucket cannot close before a finer one
+            summary = self._summarize(vehicle_id, level, bucket)
+            if summary is not None:
+                self.rollup(tier, vehicle_id).append(summary)
+
+    def _summarize(self, vehicle_id, level, bucket, include_open=False):
+        """Rollup row for one bucket of tier `level`, or None if it has no data"""
+        tier = self.tiers[level]
+        end = np.nextafter(bucket + tier, -np.inf)
+        if level == 0:
+            block = self.series(vehicle_id).range(bucket, end)
+            return summarize_readings(bucket, block) if block.shape[1] else None
+        block = self.rollup(self.tiers[level - 1], vehicle_id).range(bucket, end)
+        if include_open:
+            finer = self._open_bucket(vehicle_id, level - 1)
+            if finer is not None and bucket <= finer[0] <= end:
+                block = np.concatenate((block, finer[:, None]), axis=1)
+        return summarize_rollups(bucket, block) if block.shape[1] else None
+
+    def _open_bucket(self, vehicle_id, level):
+        """Summary of the bucket of tier `level` that is still receiving readings"""
+        last = self.series(vehicle_id).last_timestamp
+        if last == -np.inf:
+            return None
+        tier = self.tiers[level]
+        return self._summarize(vehicle_id, level, last // tier * tier, include_open=True)
+
+    def append(self, vehicle_id, timestamp, values):
+        """Append one reading; `values` maps column name to value (missing = NaN)"""
+        row = [to_epoch(timestamp)] + [values.get(name, np.nan) for name in COLUMNS]
+        with self._lock:
+            self._append_row(vehicle_id, row)
+
+    def append_records(self, records):
+        """Append reading dicts as produced by the simulator or the ingest API.
+
+        Every record is converted before any is stored; malformed ones are
+        skipped and counted in `rejected` instead of aborting the batch.
+        Returns the number of records appended.
+        """
+        rows = []
+        for record in records:
+            try:
+                row = [float(to_epoch(record["timestamp"]))] + [
+                    np.nan if record.get(name) is None else float(record[name]) for name in COLUMNS
+                ]
+                rows.append((str(record["vehicle_id"]), row))
+            except (KeyError, TypeError, ValueError):
+                self.rejected += 1
+        with self._lock:
+            for vehicle_id, row in rows:
+                self._append_row(vehicle_id, row)
+        return len(rows)
+
+    def append_frame(self, frame):
+        """Append every vehicle's reading from a FleetFrame"""
+        matrix = np.empty((len(SERIES_COLUMNS), len(frame)))
+        matrix[0] = frame.timestamp.timestamp()
+        for row, name in enumerate(COLUMNS, start=1):
+            matrix[row] = frame.columns[name]
+        with self._lock:
+            for i, vehicle_id in enumerate(frame.vehicle_ids):
+                self._append_row(str(vehicle_id), matrix[:, i])
+
+    def query(self, vehicle_id, start=None, end=None, columns=None, limit=None):
+        """Readings of one vehicle in [start, end] as {column: ndarray}, oldest first"""
+        columns = columns or SERIES_COLUMNS
+        with self._lock:
+            series = self.series(vehicle_id, create=False)
+            if series is None:
+                data = np.empty((len(SERIES_COLUMNS), 0))
+            else:
+                data = series.range(to_epoch(start), to_epoch(end), limit)
+        return {name: data[SERIES_COLUMNS.index(name)] for name in columns}
+
+    def query_rollup(self, vehicle_id, tier, start=None, end=None, limit=None):
+        """Rollup rows of one tier in [start, end] (open bucket included) as {ROLLUP_COLUMNS name: ndarray}"""
+        start, end = to_epoch(start), to_epoch(end)
+        level = self.tiers.index(tier)
+        with self._lock:
+            if self.series(vehicle_id, create=False) is None:
+                data = np.empty((len(ROLLUP_COLUMNS), 0))
+            else:
+                current = self._open_bucket(vehicle_id, level)
+                if current is not None and not (
+                    (start is None or current[0] >= start) and (end is None or current[0] <= end)
+                ):
+                    current = None
+                closed_limit = limit
+                if limit and current is not None:
+                    closed_limit = limit - 1
+                if closed_limit == 0:
+                    data = np.empty((len(ROLLUP_COLUMNS), 0))
+                else:
+                    data = self.rollup(tier, vehicle_id).range(start, end, closed_limit)
+                if current is not None:
+                    data = np.concatenate((data, current[:, None]), axis=1)
+        return dict(zip(ROLLUP_COLUMNS, data))
+
+    def history(self, vehicle_id, start=None, end=None, max_points=500):
+        """Choose the finest resolution whose point count in the window fits `max_points`.
+
+        Returns (resolution, data): resolution is None for raw readings (data
+        keyed by SERIES_COLUMNS) or the tier in seconds (keyed by ROLLUP_COLUMNS).
+        If even the coarsest tier is too dense, its newest `max_points` rows are returned.
+        """
+        start, end = to_epoch(start), to_epoch(end)
+        with self._lock:
+            series = self.series(vehicle_id, create=False)
+            if series is None or series.count(start, end) <= max_points:
+                return None, self.query(vehicle_id, start, end)
+            for tier in self.tiers:
+                # +1 for the open bucket, which is not stored yet
+                if self.rollup(tier, vehicle_id).count(start, end) + 1 <= max_points or tier == self.tiers[-1]:
+                    return tier, self.query_rollup(vehicle_id, tier, start, end, limit=max_points)
+
+    def flush(self):
+        """Persist every series' open chunk"""
+        with self._lock:
+            for series in self._series.values():
+                series.flush()
+            for series in self._rollups.values():
+                series.flush()
+            self._last_flush = time.monotonic()
+
+    def sink(self, records):
+        """TelemetryIngestBuffer sink: append a flushed batch"""
+        self.append_records(records)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
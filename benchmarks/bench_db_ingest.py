@@ -0,0 +1,78 @@
+"""Per-item vs bulk alert ingestion across Database backends.
+
+Per-item cost grows with database size on the JSON backend, so it is
+measured as the rate of `sample` single inserts into a database that already
+holds N alerts. Bulk is the rate of one add_alerts() call of N records.
+
+    python benchmarks/bench_db_ingest.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from database import create_database
+
+
+def make_alerts(n, offset=0):
+    now = datetime.now().isoformat()
+    return [
+        {
+            "alert_id": f"ALR_{offset + i}",
+            "vehicle_id": f"VH{1000 + (offset + i) % 500}",
+            "severity": ("critical", "warning", "info")[(offset + i) % 3],
+            "timestamp": now,
+            "potential_savings": 15000
+        }
+        for i in range(n)
+    ]
+
+
+def bench(backend, size, sample, workdir):
+    filename = "bench.db" if backend == "sqlite" else "bench.json"
+
+    path = os.path.join(workdir, f"bulk-{backend}-{size}", filename)
+    db = create_database(backend, path)
+    alerts = make_alerts(size)
+    start = time.perf_counter()
+    db.add_alerts(alerts)
+    bulk = size / (time.perf_counter() - start)
+    db.close()
+
+    path = os.path.join(workdir, f"item-{backend}-{size}", filename)
+    db = create_database(backend, path)
+    db.add_alerts(make_alerts(size - sample))
+    alerts = make_alerts(sample, offset=size)
+    start = time.perf_counter()
+    for alert in alerts:
+        db.add_alert(alert)
+    per_item = sample / (time.perf_counter() - start)
+    db.close()
+    return per_item, bulk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["json", "journal", "sqlite"])
+    parser.add_argument("--sample", type=int, default=100, help="single inserts timed per size")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="guardian-bench-")
+    try:
+        print(f"{'backend':<10}{'records':>10}{'per-item rec/s':>18}{'bulk rec/s':>16}{'speedup':>10}")
+        for backend in args.backends:
+            for size in args.sizes:
+                per_item, bulk = bench(backend, size, min(args.sample, size), workdir)
+                print(f"{backend:<10}{size:>10}{per_item:>18,.0f}{bulk:>16,.0f}{bulk / per_item:>9.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
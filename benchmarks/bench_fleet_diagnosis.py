@@ -0,0 +1,76 @@
+"""Fleet diagnosis: predict_failures per vehicle vs predict_failures_batch.
+
+    python benchmarks/bench_fleet_diagnosis.py --vehicles 1000 5000
+
+Vehicles get a minute of synthetic history through VehicleFeatureBuilder.
+The per-vehicle loop runs with the prediction cache disabled, and both
+paths must return identical results.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from diagnosis_agent import CACHE_BUCKETS, DiagnosisAgent
+from feature_pipeline import VehicleFeatureBuilder
+from model_store import ModelStore
+from prediction_cache import PredictionCache
+
+
+def synthetic_history(vehicles, window, seed=0):
+    rng = np.random.RandomState(seed)
+    now = time.time()
+    timestamps = now - 5.0 * np.arange(window)[::-1]
+    return {
+        f"VH{i:05d}": {
+            "timestamp": timestamps,
+            "engine_temp_celsius": rng.normal(90, 6) + rng.randn(window),
+            "oil_pressure_bar": rng.normal(3.2, 0.5) + rng.randn(window) * 0.05,
+            "sensor_health": rng.uniform(40, 100) + rng.randn(window) * 0.5
+        }
+        for i in range(vehicles)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--window", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        store = ModelStore(model_dir)
+        print(f"{'vehicles':>9}{'loop s':>9}{'batch s':>9}{'features s':>12}{'speedup':>9}")
+        for n in args.vehicles:
+            history = synthetic_history(n, args.window)
+            features = VehicleFeatureBuilder(history=lambda vehicle_id, limit: history[vehicle_id], window=args.window)
+            agent = DiagnosisAgent(store, cache=PredictionCache(CACHE_BUCKETS, max_entries=0), features=features)
+            agent.model
+            vehicle_ids = list(history)
+
+            start = time.perf_counter()
+            looped = [agent.predict_failures(vehicle_id) for vehicle_id in vehicle_ids]
+            loop_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            matrix = features.matrix(vehicle_ids)
+            feature_seconds = time.perf_counter() - start
+            batched = agent.predict_failures_batch(vehicle_ids, matrix)
+            batch_seconds = time.perf_counter() - start
+
+            if batched != looped:
+                print("batch results differ from predict_failures")
+                sys.exit(1)
+            print(
+                f"{n:>9}{loop_seconds:>9.2f}{batch_seconds:>9.3f}{feature_seconds:>12.3f}"
+                f"{loop_seconds / batch_seconds:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Fleet telemetry generation throughput: vectorized ticks vs the scalar path.
+
+    python benchmarks/bench_fleet_generator.py --sizes 1000 50000 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from real_time_simulator import RealtimeSimulator
+
+
+def bench_vectorized(size, ticks):
+    simulator = RealtimeSimulator(fleet_size=size, seed=42)
+    start = time.perf_counter()
+    for step in range(ticks):
+        simulator.generate_fleet_telemetry(step)
+    return ticks / (time.perf_counter() - start)
+
+
+def bench_scalar(size, ticks):
+    """Original per-vehicle dict path (cycles over the known vehicles)"""
+    simulator = RealtimeSimulator(seed=42)
+    vehicle_ids = list(simulator.vehicles)
+    start = time.perf_counter()
+    for step in range(ticks):
+        for i in range(size):
+            simulator.generate_telemetry(vehicle_ids[i % len(vehicle_ids)], 0.5)
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 100000, 500000])
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--scalar-max", type=int, default=10000, help="largest fleet timed on the scalar path")
+    args = parser.parse_args()
+
+    print(f"{'vehicles':>10}{'vector ticks/s':>16}{'readings/s':>16}{'scalar ticks/s':>16}{'speedup':>10}")
+    for size in args.sizes:
+        vector = bench_vectorized(size, args.ticks)
+        line = f"{size:>10}{vector:>16,.1f}{vector * size:>16,.0f}"
+        if size <= args.scalar_max:
+            scalar = bench_scalar(size, max(1, args.ticks // 10))
+            line += f"{scalar:>16,.2f}{vector / scalar:>9.0f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Telemetry frame size and encode/decode cost: compact codec vs JSON.
+
+    python benchmarks/bench_frame_codec.py --sizes 3 1000 10000 --ticks 60
+
+Each run also checks that decoded frames reproduce the JSON records exactly.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from frame_codec import FrameDecoder, FrameEncoder
+from real_time_simulator import RealtimeSimulator
+
+
+def make_frames(size, ticks):
+    simulator = RealtimeSimulator(fleet_size=size, seed=42)
+    start = datetime(2025, 1, 1)
+    return [
+        simulator.fleet.tick(simulator.degradation.at(step), start + timedelta(seconds=5 * step))
+        for step in range(ticks)
+    ]
+
+
+def bench_json(frames, indent=None):
+    separators = None if indent else (",", ":")
+    start = time.perf_counter()
+    encoded = [
+        json.dumps({"timestamp": f.timestamp.isoformat(), "vehicles": f.to_records()}, indent=indent, separators=separators)
+        for f in frames
+    ]
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    for line in encoded:
+        json.loads(line)
+    decode = time.perf_counter() - start
+    return sum(len(line.encode()) for line in encoded), encode, decode
+
+
+def bench_codec(frames):
+    start = time.perf_counter()
+    encoder = FrameEncoder.for_frame(frames[0])
+    data = encoder.header() + b"".join(encoder.encode(f) for f in frames)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    decoded = FrameDecoder().decode(data)
+    decode = time.perf_counter() - start
+    return len(data), encode, decode, decoded
+
+
+def check_parity(frames, decoded):
+    assert len(decoded) == len(frames)
+    for original, restored in zip(frames, decoded):
+        assert restored.timestamp == original.timestamp
+        assert restored.to_records() == original.to_records(), "decoded records differ from JSON records"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'vehicles':>10}{'format':>14}{'bytes/tick':>14}{'ratio':>8}{'encode ms':>12}{'decode ms':>12}")
+    for size in args.sizes:
+        frames = make_frames(size, args.ticks)
+        codec_bytes, codec_encode, codec_decode, decoded = bench_codec(frames)
+        check_parity(frames, decoded)
+        rows = [
+            ("json indent", *bench_json(frames, indent=2)),
+            ("jsonl", *bench_json(frames)),
+            ("compact", codec_bytes, codec_encode, codec_decode)
+        ]
+        for name, total, encode, decode in rows:
+            print(
+                f"{size:>10}{name:>14}{total / args.ticks:>14,.0f}{rows[0][1] / total:>7.1f}x"
+                f"{encode / args.ticks * 1000:>12.3f}{decode / args.ticks * 1000:>12.3f}"
+            )
+    print("parity: decoded frames match the JSON records")
+
+
+if __name__ == "__main__":
+    main()
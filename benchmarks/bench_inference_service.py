@@ -0,0 +1,79 @@
+"""Inference service throughput: requests/sec vs worker processes.
+
+    python benchmarks/bench_inference_service.py --workers 1 2 4 8 --clients 32 --seconds 5
+
+Each client thread sends single-row predict requests back to back through
+InferenceClient for --seconds. "in-process" scores directly in the calling
+process under the GIL (INFERENCE_WORKERS=0). Throughput can only scale up
+to the number of cores on the machine.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from diagnosis_agent import DiagnosisAgent
+from inference_service import InferenceClient, InferenceService
+from ml_predictor import AdvancedMLPredictor
+from model_store import ModelStore
+
+
+def load(client, clients, seconds, rows):
+    """Closed-loop load; returns (requests/sec, p50 ms, p99 ms)"""
+    latencies = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + seconds
+
+    def run(i):
+        rng = np.random.RandomState(i)
+        while time.perf_counter() < deadline:
+            row = rows[rng.randint(len(rows))]
+            start = time.perf_counter()
+            client.predict(row)
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    samples = np.concatenate([np.array(l) for l in latencies]) * 1000
+    return len(samples) / elapsed, np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--batch-window-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    rows = (np.array([85, 3.2, 65, 11.5, 75000, 18, 85, 90]) * (1 + np.random.RandomState(0).randn(1000, 8) * 0.05)).tolist()
+    with tempfile.TemporaryDirectory() as model_dir:
+        # Train and persist once so every worker only loads
+        store = ModelStore(model_dir)
+        local = InferenceClient(None)
+        local._local = (AdvancedMLPredictor(store), DiagnosisAgent(store))
+        local.predict(rows[0])
+        local.diagnose("VH1001")
+
+        print(f"{os.cpu_count()} CPU cores, {args.clients} concurrent clients\n")
+        print(f"{'workers':>11}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'mean batch':>12}")
+        rps, p50, p99 = load(local, args.clients, args.seconds, rows)
+        print(f"{'in-process':>11}{rps:>10.0f}{p50:>9.2f}{p99:>9.2f}{'-':>12}")
+        for workers in args.workers:
+            with InferenceService(workers, batch_window=args.batch_window_ms / 1000, model_dir=model_dir) as service:
+                rps, p50, p99 = load(InferenceClient(service), args.clients, args.seconds, rows)
+                print(f"{workers:>11}{rps:>10.0f}{p50:>9.2f}{p99:>9.2f}{service.stats()['mean_batch_size']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
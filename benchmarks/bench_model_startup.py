@@ -0,0 +1,69 @@
+"""Model startup cost: training in every process vs loading stored artifacts.
+
+    python benchmarks/bench_model_startup.py --repeats 5
+
+Each measurement runs in a fresh interpreter. "cold" points the model store
+at an empty directory (what every process paid before artifacts were
+persisted); "warm" reuses the artifacts the cold run saved.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+AGENTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'agents')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from ml_predictor import AdvancedMLPredictor
+from diagnosis_agent import DiagnosisAgent
+from data_analysis_agent import DataAnalysisAgent
+imported = time.perf_counter()
+predictor, diagnosis, analysis = AdvancedMLPredictor(), DiagnosisAgent(), DataAnalysisAgent()
+constructed = time.perf_counter()
+predictor.predict_with_confidence([85, 3.2, 65, 11.5, 75000, 18, 85, 90])
+diagnosis.predict_failures("VH1001")
+ready = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "construct": constructed - imported,
+    "first_predict": ready - constructed,
+    "total": ready - start
+}))
+"""
+
+
+def probe(model_dir):
+    env = dict(os.environ, GUARDIAN_MODEL_DIR=model_dir, PYTHONPATH=AGENTS_DIR)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, cwd=AGENTS_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"cold": [], "warm": []}
+    for _ in range(args.repeats):
+        with tempfile.TemporaryDirectory() as model_dir:
+            results["cold"].append(probe(model_dir))
+            results["warm"].append(probe(model_dir))
+
+    print(f"{'store':>8}{'import ms':>12}{'construct ms':>15}{'first predict ms':>19}{'total ms':>12}")
+    for name, runs in results.items():
+        median = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+        print(
+            f"{name:>8}{median['import']:>12.1f}{median['construct']:>15.2f}"
+            f"{median['first_predict']:>19.1f}{median['total']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Prediction cache: hit rate and score error vs bucket size.
+
+    python benchmarks/bench_prediction_cache.py --vehicles 50 --ticks 200
+
+Replays slowly drifting telemetry (a random walk per vehicle) through
+AdvancedMLPredictor with the default cache buckets scaled by each --scales
+factor, and compares every failure_risk against uncached scoring.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from ml_predictor import CACHE_BUCKETS, AdvancedMLPredictor
+from model_store import ModelStore
+from prediction_cache import PredictionCache
+
+BASE = np.array([85, 3.2, 65, 11.5, 75000, 18, 85, 90], dtype=np.float64)
+# Per-tick drift, roughly a fifth of a default bucket
+STEP = np.array(CACHE_BUCKETS) / 5
+
+
+def replay(predictor, stream):
+    start = time.perf_counter()
+    risks = np.array([predictor.predict_with_confidence(row)["failure_risk"] for row in stream])
+    return risks, (time.perf_counter() - start) / len(stream) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--scales", type=float, nargs="+", default=[0.25, 0.5, 1, 2, 4])
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    start = BASE + rng.randn(args.vehicles, len(BASE)) * STEP * 20
+    walk = np.cumsum(rng.randn(args.ticks, args.vehicles, len(BASE)) * STEP, axis=0)
+    stream = (start + walk).reshape(-1, len(BASE))
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        store = ModelStore(model_dir)
+        exact, exact_us = replay(AdvancedMLPredictor(store, cache=PredictionCache(CACHE_BUCKETS, max_entries=0)), stream)
+
+        print(f"{'bucket scale':>13}{'hit rate':>10}{'mean |err|':>12}{'max |err|':>11}{'us/call':>9}")
+        print(f"{'uncached':>13}{'-':>10}{0:>12.3f}{0:>11.1f}{exact_us:>9.1f}")
+        for scale in args.scales:
+            cache = PredictionCache(np.array(CACHE_BUCKETS) * scale)
+            risks, us = replay(AdvancedMLPredictor(store, cache=cache), stream)
+            error = np.abs(risks - exact)
+            print(f"{scale:>13g}{cache.stats()['hit_rate']:>10.3f}{error.mean():>12.3f}{error.max():>11.1f}{us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
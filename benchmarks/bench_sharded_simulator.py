@@ -0,0 +1,47 @@
+"""Sharded telemetry simulation: ticks/sec versus shard (process) count.
+
+    python benchmarks/bench_sharded_simulator.py --vehicles 200000 --shards 1 2 4 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from real_time_simulator import RealtimeSimulator
+from sharded_simulator import ShardedSimulator
+
+
+def bench_single(vehicles, ticks):
+    simulator = RealtimeSimulator(fleet_size=vehicles, seed=42)
+    start = time.perf_counter()
+    for step in range(ticks):
+        simulator.generate_fleet_telemetry(step)
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    cores = mp.cpu_count()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=200000)
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--shards", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))) or [1])
+    args = parser.parse_args()
+
+    baseline = bench_single(args.vehicles, args.ticks)
+    print(f"{args.vehicles} vehicles, {args.ticks} ticks, {cores} cores")
+    print(f"{'mode':<14}{'ticks/s':>10}{'speedup':>10}{'efficiency':>12}")
+    print(f"{'in-process':<14}{baseline:>10.2f}{1.0:>9.2f}x{'':>12}")
+    for shards in args.shards:
+        with ShardedSimulator(shards=shards, fleet_size=args.vehicles, seed=42) as simulator:
+            simulator.tick(0)  # warm up worker processes
+            result = simulator.run(args.ticks, sinks=[])
+        rate = result["ticks_per_second"]
+        print(f"{f'{shards} shards':<14}{rate:>10.2f}{rate / baseline:>9.2f}x{rate / baseline / shards:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Single-row scoring latency: sklearn predict_proba vs the compiled tree ensembles.
+
+    python benchmarks/bench_tree_compiler.py --rows 2000 --repeats 2000
+
+Checks parity first (compiled probabilities must match predict_proba within
+--tolerance on random rows, batch and single-row paths) and exits non-zero
+if they do not, then reports p50/p99 latency per single-row call.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from diagnosis_agent import DiagnosisAgent
+from ml_predictor import AdvancedMLPredictor
+from model_store import ModelStore
+
+
+def latency(fn, rows, repeats):
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        samples[i] = time.perf_counter() - start
+    return np.percentile(samples, 50) * 1e6, np.percentile(samples, 99) * 1e6
+
+
+def check_parity(name, model, compiled, X, tolerance):
+    expected = model.predict_proba(X)
+    batch = np.abs(compiled.predict_proba(X) - expected).max()
+    single = max(abs(compiled.predict_proba_one(row) - p) for row, p in zip(X, expected[:, 1]))
+    print(f"{name:>20}  max |diff| batch {batch:.2e}  single {single:.2e}")
+    return batch <= tolerance and single <= tolerance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        store = ModelStore(model_dir)
+        predictor, diagnosis = AdvancedMLPredictor(store), DiagnosisAgent(store)
+
+        rng = np.random.RandomState(0)
+        gb_rows = rng.randn(args.rows, predictor.scaler.n_features_in_)
+        rf_rows = rng.randn(args.rows, diagnosis.model.n_features_in_)
+
+        ok = check_parity("gradient boosting", predictor.model, predictor.compiled, gb_rows, args.tolerance)
+        ok &= check_parity("random forest", diagnosis.model, diagnosis.compiled, rf_rows, args.tolerance)
+        if not ok:
+            print(f"parity check failed (tolerance {args.tolerance})")
+            sys.exit(1)
+
+        raw_rows = predictor.scaler.inverse_transform(gb_rows)
+        cases = [
+            ("GB sklearn", lambda row: predictor.model.predict_proba(row.reshape(1, -1)), gb_rows),
+            ("GB compiled", predictor.compiled.predict_proba_one, gb_rows),
+            ("RF sklearn", lambda row: diagnosis.model.predict_proba(row.reshape(1, -1)), rf_rows),
+            ("RF compiled", diagnosis.compiled.predict_proba_one, rf_rows),
+            ("predict_with_confidence", predictor.predict_with_confidence, raw_rows),
+        ]
+
+        print(f"\n{'path':>24}{'p50 us':>10}{'p99 us':>10}")
+        for name, fn, rows in cases:
+            p50, p99 = latency(fn, rows, args.repeats)
+            print(f"{name:>24}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
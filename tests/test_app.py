@@ -0,0 +1,92 @@
+import multiprocessing as mp
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("crewai")
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+sys.path.insert(0, os.path.join(ROOT, 'agents'))
+
+ROW = [85, 3.2, 65, 11.5, 75000, 18, 85, 90]
+
+
+@pytest.fixture(scope="module")
+def guardian(tmp_path_factory):
+    threads, children = threading.active_count(), len(mp.active_children())
+    import app as guardian
+    import model_store
+    # Importing must not start anything; start_services() does
+    assert threading.active_count() == threads and len(mp.active_children()) == children
+
+    data = tmp_path_factory.mktemp("data")
+    patch = pytest.MonkeyPatch()
+    patch.setattr(model_store, "MODEL_DIR", str(data / "models"))
+    for name, value in {
+        "DATABASE_BACKEND": "json",
+        "DATABASE_PATH": str(data / "guardian_db.json"),
+        "ARCHIVE_DIR": str(data / "archive"),
+        "TELEMETRY_INGEST_DIR": str(data / "telemetry_ingest"),
+        "TELEMETRY_LOG_DIR": str(data / "telemetry"),
+        "TIMESERIES_DIR": str(data / "timeseries"),
+        "INFERENCE_WORKERS": 1,
+        "ONLINE_LEARNING": False
+    }.items():
+        patch.setattr(guardian.Config, name, value)
+    guardian.start_services()
+    assert guardian.start_services() is guardian.app
+    assert len(mp.active_children()) == children + 1
+    yield guardian
+    guardian.inference_service.stop()
+    patch.undo()
+
+
+@pytest.fixture
+def client(guardian):
+    return guardian.app.test_client()
+
+
+def test_predict_in_worker(client):
+    response = client.post('/api/ml/predict', json={"features": ROW})
+    assert response.status_code == 200
+
+
+def test_wrong_width_predict_is_a_bad_request_in_worker_mode(client):
+    response = client.post('/api/ml/predict', json={"features": ROW[:3]})
+    assert response.status_code == 400
+    assert client.get('/api/ml/status').get_json()["data"]["restarts"] == 0
+
+
+def test_bad_time_bound_is_a_bad_request(client):
+    assert client.get('/api/alerts?since=notadate').status_code == 400
+    assert client.get('/api/workflows?until=2025-13-45').status_code == 400
+    assert client.get('/api/alerts?since=2000-01-01T00:00:00').status_code == 200
+
+
+def test_late_readings_are_rejected_at_ingest(client):
+    readings = [
+        {"vehicle_id": "VH_LATE", "timestamp": ts, "engine_temp_celsius": 90, "oil_pressure_bar": 3.0,
+         "sensor_health": 80}
+        for ts in ("2025-01-01T00:05:00", "2025-01-01T00:04:00")
+    ]
+    response = client.post('/api/telemetry/batch', json=readings).get_json()
+    assert response["accepted"] == 1 and response["rejected"][0]["index"] == 1
+    assert client.get('/api/telemetry/stream').get_json()["ingest"]["rejected_late"] == 1
+
+
+def test_diagnose_get_is_read_only(client):
+    before = client.get('/api/analytics').get_json()["data"]["total_predictions"]
+    assert client.get('/api/ml/diagnose/VH1001').status_code == 200
+    assert client.get('/api/analytics').get_json()["data"]["total_predictions"] == before
+    assert client.post('/api/ml/diagnose/VH1001').status_code == 200
+    assert client.get('/api/analytics').get_json()["data"]["total_predictions"] == before + 1
+
+
+def test_health_reports_database_cache(client):
+    client.get('/api/alerts')
+    cache = client.get('/api/health').get_json()["database_cache"]
+    assert cache["hits"] + cache["misses"] > 0
@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from database import JournaledDatabase, apply_ops, append_op, create_database
+
+
+def make_alerts(n, offset=0):
+    now = datetime.now().isoformat()
+    return [
+        {
+            "alert_id": f"ALR_{offset + i}",
+            "vehicle_id": f"VH{1000 + (offset + i) % 50}",
+            "severity": ("critical", "warning", "info")[(offset + i) % 3],
+            "timestamp": now,
+            "potential_savings": 100
+        }
+        for i in range(n)
+    ]
+
+
+def per_insert_seconds(path, existing, sample=200):
+    db = JournaledDatabase(path, compact_every=10 ** 9)
+    db.add_alerts(make_alerts(existing))
+    alerts = make_alerts(sample, offset=existing)
+    start = time.perf_counter()
+    for alert in alerts:
+        db.add_alert(alert)
+    elapsed = (time.perf_counter() - start) / sample
+    db.close()
+    return elapsed
+
+
+def test_apply_ops_appends_in_place_and_copies_touched_aggregates():
+    doc = {"alerts": [], "vehicles": [], "analytics": {}}
+    doc = apply_ops(doc, [append_op("alerts", make_alerts(3), "total_alerts")])
+    alerts, by_severity = doc["alerts"], doc["aggregates"]["alerts_by_severity"]
+    new = apply_ops(doc, [append_op("alerts", make_alerts(1, offset=3), "total_alerts")])
+    assert new["alerts"] is alerts and len(alerts) == 4
+    assert by_severity == {"critical": 1, "warning": 1, "info": 1}
+    assert new["aggregates"]["alerts_by_severity"]["critical"] == 2
+    assert doc["analytics"]["total_alerts"] == 3 and new["analytics"]["total_alerts"] == 4
+
+
+def test_journal_insert_cost_stays_flat(tmp_path):
+    small = min(per_insert_seconds(str(tmp_path / f"small{i}" / "db.json"), 1000) for i in range(3))
+    large = min(per_insert_seconds(str(tmp_path / f"large{i}" / "db.json"), 100000) for i in range(3))
+    # O(n) copies made this ~80x slower; allow generous noise for an O(1) append
+    assert large < small * 5
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_reopen_matches_live_view(tmp_path, backend):
+    filename = "db.db" if backend == "sqlite" else "db.json"
+    path = str(tmp_path / filename)
+    db = create_database(backend, path)
+    for alert in make_alerts(20):
+        db.add_alert(alert)
+    live = db.get_analytics()
+    db.close()
+    reopened = create_database(backend, path)
+    assert reopened.get_analytics() == live
+    assert len(reopened.query("alerts", limit=100)["items"]) == 20
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_query_rejects_unparseable_bounds(tmp_path, backend):
+    filename = "db.db" if backend == "sqlite" else "db.json"
+    db = create_database(backend, str(tmp_path / filename))
+    db.add_alerts(make_alerts(3))
+    for bound in ("since", "until"):
+        with pytest.raises(ValueError, match=bound):
+            db.query("alerts", **{bound: "notadate"})
+    assert len(db.query("alerts", since="2000-01-01T00:00:00", until="")["items"]) == 3
+    db.close()
+
+
+def legacy_document():
+    """A guardian_db.json as written before aggregates were materialized"""
+    return {
+        "version": "1.0",
+        "created_at": "2025-10-31T12:00:00",
+        "vehicles": [{"vehicle_id": "VH1001"}, {"vehicle_id": "VH1002"}],
+        "workflows": [],
+        "alerts": make_alerts(4),
+        "appointments": [],
+        "predictions": [],
+        "analytics": {"total_predictions": 0, "total_alerts": 4, "total_appointments": 0, "cost_savings": 0}
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "journal"])
+def test_legacy_file_gets_aggregates_on_load(tmp_path, backend):
+    path = tmp_path / "guardian_db.json"
+    path.write_text(json.dumps(legacy_document()))
+    db = create_database(backend, str(path))
+    aggregates = db.get_analytics()["aggregates"]
+    assert aggregates["total_vehicles"] == 2
+    assert aggregates["alerts_by_severity"] == {"critical": 2, "warning": 1, "info": 1}
+    assert db.get_analytics()["analytics"]["cost_savings"] == 400
+    db.close()
+    assert "aggregates" in json.loads(path.read_text())
+
+
+def test_legacy_sqlite_gets_aggregates_on_load(tmp_path):
+    path = str(tmp_path / "guardian.db")
+    db = create_database("sqlite", path)
+    db.write(legacy_document())
+    with db._conn() as conn:
+        conn.execute("DELETE FROM meta WHERE key = 'aggregates'")
+    db.close()
+    aggregates = create_database("sqlite", path).get_analytics()["aggregates"]
+    assert aggregates["total_vehicles"] == 2
+    assert aggregates["alerts_by_severity"] == {"critical": 2, "warning": 1, "info": 1}
@@ -0,0 +1,44 @@
+import os
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from inference_service import InferenceClient, InferenceError, InferenceService, WorkerLostError
+
+ROW = [85, 3.2, 65, 11.5, 75000, 18, 85, 90]
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    service = InferenceService(1, model_dir=str(tmp_path_factory.mktemp("models"))).start()
+    yield InferenceClient(service, timeout=30)
+    service.stop()
+
+
+def test_predict_in_worker(client):
+    result = client.predict(ROW)
+    assert 0 <= result["failure_risk"] <= 100
+
+
+def test_wrong_width_is_an_inference_error_not_a_lost_worker(client):
+    with pytest.raises(InferenceError) as raised:
+        client.predict(ROW[:3])
+    assert not isinstance(raised.value, WorkerLostError)
+    assert client.service.stats()["restarts"] == 0
+    # Only the malformed row of a mixed batch fails
+    futures = [client.service.submit("predict", row) for row in (ROW, ROW[:3])]
+    assert futures[0].result(30)["failure_risk"] >= 0
+    assert isinstance(futures[1].exception(30), InferenceError)
+
+
+def test_abandon_forgets_batches_nobody_waits_on():
+    service = InferenceService(1)
+    waiting, gone, partial = Future(), Future(), Future()
+    service._inflight = {0: [gone], 1: [waiting], 2: [partial, gone]}
+    service._owners = {0: 123}
+    service.abandon([gone, partial])
+    assert gone.cancelled() and not waiting.done()
+    assert service._inflight == {1: [waiting]} and service._owners == {}
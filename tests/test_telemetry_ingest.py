@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from telemetry_ingest import TelemetryIngestBuffer
+from timeseries_store import TimeSeriesStore, to_epoch
+
+
+def reading(vehicle_id, timestamp):
+    return {"vehicle_id": vehicle_id, "timestamp": timestamp, "engine_temp_celsius": 90,
+            "oil_pressure_bar": 3.0, "sensor_health": 80}
+
+
+def test_late_readings_are_found_against_accepted_and_stored_history(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.append_records([reading("VH2", "2025-01-01T00:10:00")])
+    buffer = TelemetryIngestBuffer(sinks=[store.sink], watermark=store.last_timestamp)
+    assert buffer.offer([reading("VH1", "2025-01-01T00:05:00")])
+
+    batch = [
+        reading("VH1", "2025-01-01T00:04:00"),  # before the accepted reading
+        reading("VH1", "2025-01-01T00:06:00"),
+        reading("VH1", "2025-01-01T00:05:30"),  # before an earlier reading of this batch
+        reading("VH2", "2025-01-01T00:09:00"),  # before stored history
+        reading("VH2", None),
+        reading("VH3", "2025-01-01T00:00:00")
+    ]
+    assert buffer.late(batch) == [0, 2, 3]
+    assert buffer.stats()["rejected_late"] == 3
+
+
+def test_store_counts_out_of_order_rows(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.append_records([reading("VH1", "2025-01-01T00:05:00"), reading("VH1", "2025-01-01T00:04:00")])
+    assert store.last_timestamp("VH1") == to_epoch("2025-01-01T00:05:00")
+    assert store.last_timestamp("VH9") is None
+    assert store.stats()["out_of_order"] == 1
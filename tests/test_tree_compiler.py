@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from tree_compiler import CompiledTreeEnsemble, compile_model
+
+N_FEATURES = 6
+
+
+def training_data(seed=0, samples=400):
+    rng = np.random.RandomState(seed)
+    X = rng.randn(samples, N_FEATURES)
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] * X[:, 3] + 0.3 * rng.randn(samples) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture(params=["gradient_boosting", "random_forest"])
+def fitted(request):
+    X, y = training_data()
+    if request.param == "gradient_boosting":
+        model = GradientBoostingClassifier(n_estimators=30, max_depth=4, learning_rate=0.1, random_state=0)
+    else:
+        model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0)
+    return model.fit(X, y)
+
+
+def test_batch_matches_predict_proba(fitted):
+    X, _ = training_data(seed=1, samples=500)
+    compiled = compile_model(fitted)
+    np.testing.assert_allclose(compiled.predict_proba(X), fitted.predict_proba(X), atol=1e-9)
+
+
+def test_single_row_matches_predict_proba(fitted):
+    X, _ = training_data(seed=2, samples=50)
+    compiled = compile_model(fitted)
+    expected = fitted.predict_proba(X)[:, 1]
+    actual = [compiled.predict_proba_one(row) for row in X]
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+
+def test_threshold_ties_follow_sklearn(fitted):
+    # Rows sitting exactly on a split threshold exercise the float32 comparison
+    compiled = compile_model(fitted)
+    internal = np.flatnonzero(compiled.children[0::2] != np.arange(len(compiled.feature)))[:200]
+    X = np.zeros((len(internal), N_FEATURES))
+    X[np.arange(len(internal)), compiled.feature[internal]] = compiled.threshold[internal]
+    np.testing.assert_allclose(compiled.predict_proba(X), fitted.predict_proba(X), atol=1e-9)
+
+
+def test_save_load_round_trip(fitted, tmp_path):
+    X, _ = training_data(seed=3, samples=100)
+    compiled = compile_model(fitted)
+    path = tmp_path / "compiled.npz"
+    compiled.save(path)
+    loaded = CompiledTreeEnsemble.load(path)
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+
+
+@pytest.mark.parametrize("width", [N_FEATURES - 1, N_FEATURES + 1])
+def test_wrong_width_is_rejected(fitted, width):
+    compiled = compile_model(fitted)
+    with pytest.raises(ValueError):
+        compiled.predict_proba(np.zeros((3, width)))
+    with pytest.raises(ValueError):
+        compiled.predict_proba_one(np.zeros(width))
+
+
+def test_non_tree_models_are_not_compiled():
+    from sklearn.linear_model import LogisticRegression
+    X, y = training_data()
+    assert compile_model(LogisticRegression().fit(X, y)) is None
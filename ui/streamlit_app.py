@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 import time
 import sys
 import os
+import threading
 
 # ============= PAGE CONFIG =============
 st.set_page_config(page_title="GUARDIAN", layout="wide", initial_sidebar_state="expanded")
@@ -59,6 +60,70 @@ def fetch_from_api(endpoint):
     except Exception as e:
         return None
 
+class TelemetryFeed:
+    """Background consumer of /telemetry/events (Server-Sent Events).
+
+    Keeps the latest reading per vehicle from the initial snapshot plus the
+    changed-only updates, and resumes with Last-Event-ID after a disconnect.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.vehicles = {}
+        self.last_event_id = None
+        self.last_update = None
+        self.connected = False
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _apply(self, event, data):
+        readings = json.loads(data)
+        with self._lock:
+            if event == "snapshot":
+                self.vehicles = {}
+            for reading in readings:
+                self.vehicles[reading['vehicle_id']] = reading
+            self.last_update = datetime.now()
+
+    def _run(self):
+        while True:
+            headers = {"Accept": "text/event-stream"}
+            if self.last_event_id is not None:
+                headers["Last-Event-ID"] = self.last_event_id
+            try:
+                with requests.get(self.url, headers=headers, stream=True, timeout=(5, 60)) as response:
+                    self.connected = response.status_code == 200
+                    event_id, event, data = None, "message", []
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line is None:
+                            continue
+                        if line == "":
+                            if data:
+                                self._apply(event, "\n".join(data))
+                                if event_id is not None:
+                                    self.last_event_id = event_id
+                            event_id, event, data = None, "message", []
+                        elif line.startswith("id:"):
+                            event_id = line[3:].strip()
+                        elif line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+            except Exception:
+                pass
+            self.connected = False
+            time.sleep(2)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.vehicles.values()), self.last_update
+
+
+@st.cache_resource
+def telemetry_feed():
+    """One shared SSE connection per Streamlit server process"""
+    return TelemetryFeed(f"{API_URL}/telemetry/events")
+
 # ============= BACKEND STATUS =============
 health = fetch_from_api("/health")
 if health and health.get('status') == 'OK':
@@ -106,11 +171,11 @@ if page == "📊 Dashboard":
     
     with col2:
         st.subheader("🎯 Recent Predictions")
-        workflows = fetch_from_api("/workflows")
+        workflows = fetch_from_api("/workflows?limit=3")
         if workflows:
             workflow_list = workflows.get('data', [])
             if workflow_list:
-                recent = workflow_list[-3:]
+                recent = workflow_list
                 for w in recent:
                     st.write(f"• {w.get('vehicle_id')} - {w.get('status')}")
             else:
@@ -119,14 +184,19 @@ if page == "📊 Dashboard":
 # ============= PAGE 2: REAL-TIME STREAM =============
 elif page == "🔴 Real-Time Stream":
     st.header("🔴 Real-Time Telemetry Dashboard")
-    st.write("**LIVE - Updates every 3 seconds**")
+    st.write("**LIVE - Pushed from the backend as readings change**")
     
-    col1, col2, col3, col4 = st.columns(4)
+    feed = telemetry_feed()
     
-    telemetry = fetch_from_api("/telemetry/stream")
-    if telemetry:
-        telemetry_data = telemetry.get('data', {})
-        vehicles_data = telemetry_data.get('vehicles', [])
+    @st.fragment(run_every=1)
+    def live_telemetry():
+        vehicles_data, last_update = feed.snapshot()
+        if not vehicles_data:
+            # No pushed data yet (stream still connecting): fall back to polling
+            telemetry = fetch_from_api("/telemetry/stream")
+            vehicles_data = telemetry.get('data', {}).get('vehicles', []) if telemetry else []
+        
+        col1, col2, col3, col4 = st.columns(4)
         
         if vehicles_data:
             avg_health = sum([v.get('sensor_health', 0) for v in vehicles_data]) / len(vehicles_data)
@@ -140,7 +210,11 @@ elif page == "🔴 Real-Time Stream":
             with col3:
                 st.metric("Critical Alerts", critical_count, delta=f"+{critical_count}")
             with col4:
-                st.metric("Last Update", datetime.now().strftime("%H:%M:%S"), delta="< 3s")
+                st.metric(
+                    "Last Update",
+                    (last_update or datetime.now()).strftime("%H:%M:%S"),
+                    delta="live" if feed.connected else "polling"
+                )
             
             st.markdown("---")
             
@@ -170,6 +244,8 @@ elif page == "🔴 Real-Time Stream":
                         st.error(f"🔴 {v.get('vehicle_id')}: CRITICAL - Temp {v.get('engine_temp_celsius')}°C, Health {v.get('sensor_health')}%")
                     else:
                         st.warning(f"🟡 {v.get('vehicle_id')}: WARNING - Degradation {v.get('degradation_factor')}")
+    
+    live_telemetry()
 
 # ============= PAGE 3: FLEET MONITOR =============
 elif page == "🚗 Fleet Monitor":
@@ -234,11 +310,11 @@ elif page == "🔍 Vehicle Analysis":
 elif page == "⚠️ Predictive Alerts":
     st.header("⚠️ Predictive Alerts")
     
-    alerts = fetch_from_api("/alerts")
+    alerts = fetch_from_api("/alerts?limit=50")
     if alerts:
         alert_list = alerts.get('data', [])
         
-        st.subheader(f"Total Alerts: {len(alert_list)}")
+        st.subheader(f"Latest Alerts: {len(alert_list)}")
         
         for alert in alert_list:
             severity = alert.get('severity')
@@ -251,14 +327,14 @@ elif page == "⚠️ Predictive Alerts":
 elif page == "⚙️ Workflows":
     st.header("⚙️ Workflow Executions")
     
-    workflows = fetch_from_api("/workflows")
+    workflows = fetch_from_api("/workflows?limit=5")
     if workflows:
         workflow_list = workflows.get('data', [])
         
-        st.subheader(f"Total Workflows: {len(workflow_list)}")
+        st.subheader(f"Latest Workflows: {len(workflow_list)}")
         
         if workflow_list:
-            for w in workflow_list[-5:]:
+            for w in workflow_list:
                 with st.expander(f"{w.get('workflow_id')} - {w.get('vehicle_id')}"):
                     st.write(f"**Status:** {w.get('status')}")
 
@@ -276,7 +352,8 @@ elif page == "📈 Analytics":
             st.metric("Total Alerts", data.get('total_alerts', 0))
         
         with col2:
-            st.metric("Cost Savings", f"₹{data.get('total_cost_savings', 0):,}")
+            st.metric("Cost Savings", f"₹{data.get('total_estimated_savings', 0):,}")
+            st.metric("Savings (30 days)", f"₹{data.get('rolling_savings_30d', 0):,}")
 
 # ============= PAGE 8: EXPLAINABLE AI =============
 elif page == "🧠 Explainable AI":